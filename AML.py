@@ -1,74 +1,163 @@
+import io
+import os
+import json
+import shutil
+import re
+import hashlib
+import time
+import logging
+import threading
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+import unicodedata
+import numpy as np
 import pandas as pd
 import jellyfish
 
+from ttl_cache import TTLCache
+
+# 📁 Emplacement de la base AML (fichier Excel ou dossier .watchlist), configurable par variable d'environnement
+AML_WATCHLIST_PATH = os.environ.get(
+    "AML_WATCHLIST_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "AML-augmented.xlsx"))
+
+# 📁 Plusieurs listes nommées, ex. AML_WATCHLISTS="sanctions=/data/sanctions.xlsx;pep=/data/pep.watchlist"
+def watchlist_paths():
+    """Listes AML configurées : {nom de la liste: chemin}"""
+    config = os.environ.get("AML_WATCHLISTS", "").strip()
+    if not config:
+        return {"AML": AML_WATCHLIST_PATH}
+    paths = {}
+    for entry in config.split(";"):
+        if entry.strip():
+            name, _, path = entry.partition("=")
+            paths[name.strip()] = path.strip()
+    return paths
+
+# 💾 Format colonnes de la base AML (dossier de fichiers .npy projetés en mémoire)
+WATCHLIST_DIR_SUFFIX = ".watchlist"
+WATCHLIST_FORMAT_VERSION = 2  # 2 : index complet (groupes Soundex/mots, vocabulaire CSR) exporté
+# Index commun de plusieurs listes au format colonnes (vide = dossier de la première liste)
+AML_COMBINED_INDEX_DIR = os.environ.get("AML_COMBINED_INDEX_DIR", "")
+
+# 📝 Journal AML : détail des comparaisons (DEBUG) et résumé de chaque vérification (INFO)
+logger = logging.getLogger("AML")
+
+def enable_diagnostics(level=logging.DEBUG):
+    """Active le journal des scores de chaque comparaison (désactivé par défaut)"""
+    logger.setLevel(level)
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+        logger.addHandler(handler)
+
+if os.environ.get("AML_DIAGNOSTICS"):
+    enable_diagnostics()
+
+# 🔤 Table de translittération arabe vers alphabet latin (compilée une seule fois)
+ARABIC_TO_LATIN = str.maketrans({
+    'ا': 'a', 'ب': 'b', 'ت': 't', 'ث': 'th', 'ج': 'j', 'ح': 'h', 'خ': 'kh',
+    'د': 'd', 'ذ': 'dh', 'ر': 'r', 'ز': 'z', 'س': 's', 'ش': 'sh', 'ص': 's',
+    'ض': 'd', 'ط': 't', 'ظ': 'z', 'ع': 'a', 'غ': 'gh', 'ف': 'f', 'ق': 'q',
+    'ك': 'k', 'ل': 'l', 'م': 'm', 'ن': 'n', 'ه': 'h', 'و': 'w', 'ي': 'y',
+    'ء': '', 'ى': 'a', 'ة': 'a', 'أ': 'a', 'إ': 'i', 'آ': 'aa'
+})
+ARABIC_CHARS = re.compile('[\u0600-\u06FF]')
+
+# Nombre de noms saisis gardés en cache (un même client est vérifié par /formulaire puis /save)
+PREPROCESS_CACHE_SIZE = 4096
+# Couples de mots (prénom, nom) dont la similarité est gardée en cache
+WORD_SIMILARITY_CACHE_SIZE = 65536
+# Résultats de vérification gardés en cache (nom prétraité + version de la base)
+RESULT_CACHE_SIZE = 1024
+RESULT_CACHE_TTL = 600  # secondes
+
 # 🔤 Fonction de translittération arabe vers alphabet latin
 def arabic_to_latin(arabic_name):
-    mapping = {
-        'ا': 'a', 'ب': 'b', 'ت': 't', 'ث': 'th', 'ج': 'j', 'ح': 'h', 'خ': 'kh',
-        'د': 'd', 'ذ': 'dh', 'ر': 'r', 'ز': 'z', 'س': 's', 'ش': 'sh', 'ص': 's',
-        'ض': 'd', 'ط': 't', 'ظ': 'z', 'ع': 'a', 'غ': 'gh', 'ف': 'f', 'ق': 'q',
-        'ك': 'k', 'ل': 'l', 'م': 'm', 'ن': 'n', 'ه': 'h', 'و': 'w', 'ي': 'y',
-        'ء': '', 'ى': 'a', 'ة': 'a', 'أ': 'a', 'إ': 'i', 'آ': 'aa'
-    }
-    return ''.join([mapping.get(c, c) for c in arabic_name])
+    return arabic_name.translate(ARABIC_TO_LATIN)
 
-# 🔧 Normalisation et translittération si nécessaire
-def preprocess(name):
-    name = str(name).strip().lower()
-    if any('\u0600' <= c <= '\u06FF' for c in name):  # détecte les caractères arabes
+# 🔧 Normalisation et translittération si nécessaire (sans cache, pour la base AML)
+def normalize_name(name):
+    name = name.strip().lower()
+    if ARABIC_CHARS.search(name):  # détecte les caractères arabes
         name = arabic_to_latin(name)
     return name
 
+@lru_cache(maxsize=PREPROCESS_CACHE_SIZE)
+def _preprocess_cached(name):
+    return normalize_name(name)
+
+# 🔧 Normalisation d'un nom saisi (mise en cache)
+def preprocess(name):
+    return _preprocess_cached(str(name))
+
 # 🔄 Vérification d'inversion de mots (prénom/nom)
 def check_word_inversion(input_name, target_name):
     """Vérifie si les noms sont des inversions l'un de l'autre"""
-    input_words = input_name.split()
-    target_words = target_name.split()
-    
+    return _check_word_inversion(input_name.split(), target_name.split())
+
+# 🔄 Similarité de deux mots (les listes AML réutilisent beaucoup les mêmes prénoms et noms)
+@lru_cache(maxsize=WORD_SIMILARITY_CACHE_SIZE)
+def _word_similarity(i_word, t_word):
+    return jellyfish.jaro_winkler_similarity(i_word, t_word)
+
+def _check_word_inversion(input_words, target_words):
     # Cas 1: Mots identiques dans un ordre différent
     if len(input_words) == len(target_words) and set(input_words) == set(target_words):
         return True
+
+    if len(input_words) < 2 or len(target_words) < 2:
+        return False
+
+    # Similarités Jaro-Winkler de chaque couple de mots, calculées une seule fois
+    similarity = [[_word_similarity(i_word, t_word) for t_word in target_words]
+                  for i_word in input_words]
     
     # Cas 2: Deux mots - vérification croisée avec seuils ajustés
     if len(input_words) == 2 and len(target_words) == 2:
         # Ordre normal: input[0] vs target[0] et input[1] vs target[1]
-        normal_sim = (jellyfish.jaro_winkler_similarity(input_words[0], target_words[0]) + 
-                     jellyfish.jaro_winkler_similarity(input_words[1], target_words[1])) / 2
+        normal_sim = (similarity[0][0] + similarity[1][1]) / 2
         
         # Ordre inversé: input[0] vs target[1] et input[1] vs target[0]
-        inverse_sim = (jellyfish.jaro_winkler_similarity(input_words[0], target_words[1]) + 
-                      jellyfish.jaro_winkler_similarity(input_words[1], target_words[0])) / 2
+        inverse_sim = (similarity[0][1] + similarity[1][0]) / 2
         
         # Seuil plus permissif pour les inversions (0.75 au lieu de 0.85)
         max_similarity = max(normal_sim, inverse_sim)
         
         if max_similarity > 0.75:
-            print(f"🔄 Inversion détectée: similarité normale={normal_sim:.3f}, inversée={inverse_sim:.3f}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🔄 Inversion détectée: similarité normale=%.3f, inversée=%.3f", normal_sim, inverse_sim)
             return True
     
     # Cas 3: Vérification avec des mots partiellement similaires
-    if len(input_words) >= 2 and len(target_words) >= 2:
-        for i_word in input_words:
-            for t_word in target_words:
-                if jellyfish.jaro_winkler_similarity(i_word, t_word) > 0.85:
-                    # Si on trouve un mot très similaire, vérifier les autres
-                    remaining_input = [w for w in input_words if w != i_word]
-                    remaining_target = [w for w in target_words if w != t_word]
-                    
-                    if remaining_input and remaining_target:
-                        for ri_word in remaining_input:
-                            for rt_word in remaining_target:
-                                if jellyfish.jaro_winkler_similarity(ri_word, rt_word) > 0.75:
-                                    print(f"🔄 Correspondance partielle: '{i_word}' ≈ '{t_word}' et '{ri_word}' ≈ '{rt_word}'")
-                                    return True
+    for i, i_word in enumerate(input_words):
+        for t, t_word in enumerate(target_words):
+            if similarity[i][t] > 0.85:
+                # Si on trouve un mot très similaire, vérifier les autres
+                remaining_input = [ri for ri, w in enumerate(input_words) if w != i_word]
+                remaining_target = [rt for rt, w in enumerate(target_words) if w != t_word]
+                
+                for ri in remaining_input:
+                    for rt in remaining_target:
+                        if similarity[ri][rt] > 0.75:
+                            if logger.isEnabledFor(logging.DEBUG):
+                                logger.debug("🔄 Correspondance partielle: '%s' ≈ '%s' et '%s' ≈ '%s'",
+                                             i_word, t_word, input_words[ri], target_words[rt])
+                            return True
     
     return False
 
 # 🔍 Comparaison avec les algorithmes de similarité
 def is_similar(input_name, target_name):
-    input_proc = preprocess(input_name)
-    target_proc = preprocess(target_name)
+    return is_similar_processed(preprocess(input_name), preprocess(target_name))
+
+# 📏 Seuils Jaro-Winkler / Levenshtein selon la longueur du nom le plus court
+def _thresholds(input_proc, target_proc):
+    if min(len(input_proc), len(target_proc)) < 8:
+        return 0.65, 4  # Seuils plus permissifs pour les noms courts
+    return 0.75, 5      # Seuils standards pour les noms longs
 
+# 🔬 Calcul de tous les critères (mode diagnostic et benchmarks)
+def similarity_details(input_proc, target_proc):
     jaro = jellyfish.jaro_winkler_similarity(input_proc, target_proc)
     levenshtein = jellyfish.levenshtein_distance(input_proc, target_proc)
     soundex_match = jellyfish.soundex(input_proc) == jellyfish.soundex(target_proc)
@@ -76,43 +165,655 @@ def is_similar(input_name, target_name):
     # Vérification d'inversion de mots
     word_inversion = check_word_inversion(input_proc, target_proc)
 
-    print(f"🧪 Comparaison : '{input_proc}' vs '{target_proc}' | Jaro: {jaro:.3f} | Levenshtein: {levenshtein} | Soundex: {soundex_match} | Inversion: {word_inversion}")
+    jaro_min, levenshtein_max = _thresholds(input_proc, target_proc)
+    is_match = jaro > jaro_min or levenshtein < levenshtein_max or soundex_match or word_inversion
+    return {
+        'jaro': jaro,
+        'levenshtein': levenshtein,
+        'soundex': soundex_match,
+        'inversion': word_inversion,
+        'match': is_match
+    }
 
-    # Critères ajustés pour une détection plus réaliste
-    name_length = min(len(input_proc), len(target_proc))
-    
-    if name_length < 8:
-        # Seuils plus permissifs pour les noms courts
-        is_match = jaro > 0.65 or levenshtein < 4 or soundex_match or word_inversion
-    else:
-        # Seuils standards pour les noms longs
-        is_match = jaro > 0.75 or levenshtein < 5 or soundex_match or word_inversion
-    
-    if is_match:
-        print(f"✅ MATCH trouvé: Jaro={jaro:.3f} | Levenshtein={levenshtein} | Soundex={soundex_match} | Inversion={word_inversion}")
-    
-    return is_match
+# 🔍 Comparaison de deux noms déjà prétraités
+def is_similar_processed(input_proc, target_proc):
+    if logger.isEnabledFor(logging.DEBUG):
+        details = similarity_details(input_proc, target_proc)
+        logger.debug("🧪 Comparaison : '%s' vs '%s' | Jaro: %.3f | Levenshtein: %d | Soundex: %s | Inversion: %s | Match: %s",
+                     input_proc, target_proc, details['jaro'], details['levenshtein'], details['soundex'],
+                     details['inversion'], details['match'])
+        return details['match']
+
+    return _is_similar_tiered(input_proc, jellyfish.soundex(input_proc), input_proc.split(),
+                              target_proc, jellyfish.soundex(target_proc), target_proc.split())
+
+# ⚡ Critères évalués du moins coûteux au plus coûteux : arrêt au premier critère vérifié
+def _is_similar_tiered(input_proc, input_soundex, input_words, target_proc, target_soundex, target_words=None):
+    if input_soundex == target_soundex:
+        return True
+
+    jaro_min, levenshtein_max = _thresholds(input_proc, target_proc)
+    if jellyfish.jaro_winkler_similarity(input_proc, target_proc) > jaro_min:
+        return True
+
+    # Levenshtein borné : inutile de le calculer si l'écart de longueur dépasse déjà le seuil.
+    # jellyfish compte les graphèmes : la borne n'est valable que si chaque caractère en est un
+    # (sinon, ex. voyelles arabes accrochées aux lettres latines, la distance est calculée)
+    if (abs(len(input_proc) - len(target_proc)) < levenshtein_max
+            or not (_is_simple(input_proc) and _is_simple(target_proc))) and \
+            jellyfish.levenshtein_distance(input_proc, target_proc) < levenshtein_max:
+        return True
+
+    # Inversion prénom/nom en dernier (comparaison mot à mot), mots découpés seulement si besoin
+    return _check_word_inversion(input_words, target_proc.split() if target_words is None else target_words)
+
+# 🧮 Noms dont chaque caractère est un graphème à part entière (bornes valides)
+def _is_simple(name):
+    for c in name:
+        if c < '\u0300':
+            if c == '\r':
+                return False
+        elif not ('\u0600' <= c <= '\u06FF' and unicodedata.category(c) in ('Lo', 'Nd', 'Po')):
+            return False
+    return True
+
+# 🧮 Matrice des occurrences de caractères (une ligne par nom)
+def _char_counts(names, alphabet):
+    lengths = np.fromiter((len(n) for n in names), dtype=np.int64, count=len(names))
+    counts = np.zeros((len(names), len(alphabet)), dtype=np.uint16)
+    if lengths.sum():
+        rows = np.repeat(np.arange(len(names)), lengths)
+        cols = np.fromiter((alphabet[c] for n in names for c in n), dtype=np.int64, count=int(lengths.sum()))
+        np.add.at(counts, (rows, cols), 1)
+    return lengths, counts
+
+# 🧮 Quatre premiers caractères (préfixe Jaro-Winkler), complétés par 0
+def _prefixes(names):
+    prefixes = np.zeros((len(names), 4), dtype=np.uint32)
+    for i, name in enumerate(names):
+        for j, c in enumerate(name[:4]):
+            prefixes[i, j] = ord(c)
+    return prefixes
+
+# 🔑 Clé d'un ensemble de mots (nombre de mots + mots distincts), stable d'un processus à l'autre
+def _wordset_key(words):
+    content = f"{len(words)}\0" + "\0".join(sorted(set(words)))
+    digest = hashlib.blake2b(content.encode('utf-8', 'surrogatepass'), digest_size=8).digest()
+    return np.frombuffer(digest, dtype=np.int64)[0]
+
+# 🔎 Lignes d'un groupe : clés triées + ordre des lignes (équivalent d'un dict de listes, en tableaux)
+def _bucket(sorted_keys, order, key):
+    lo = np.searchsorted(sorted_keys, key, side='left')
+    hi = np.searchsorted(sorted_keys, key, side='right')
+    return order[lo:hi]
+
+# 🗂️ Index de présélection des candidats (aucun match perdu)
+class WatchlistIndex:
+    """Réduit la liste AML aux noms pouvant satisfaire au moins un critère de is_similar
+
+    Tout l'index tient dans des tableaux NumPy : relus depuis le dossier .watchlist, ils sont projetés
+    en mémoire et partagés entre workers au lieu d'être reconstruits dans chaque processus.
+    """
+
+    # Tableaux précalculés enregistrés avec la base au format colonnes
+    ARRAYS = ('soundex', 'lengths', 'counts', 'prefixes', 'always',
+              'soundex_keys', 'soundex_order', 'wordset_keys', 'wordset_order',
+              'vocabulary', 'postings_offsets', 'postings',
+              'vocab_lengths', 'vocab_counts', 'vocab_prefixes', 'vocab_always')
+
+    def __init__(self, names, alphabet=None, arrays=None):
+        self.size = len(names)
+        if arrays is None:
+            self.alphabet = {}
+            for name in names:
+                for c in name:
+                    self.alphabet.setdefault(c, len(self.alphabet))
+            arrays = self._build(names, self.alphabet)
+        else:
+            # Tableaux relus depuis le disque (éventuellement projetés en mémoire)
+            self.alphabet = {c: col for col, c in enumerate(alphabet)}
+        for attr in self.ARRAYS:
+            setattr(self, attr, arrays[attr])
+
+    @staticmethod
+    def _build(names, alphabet):
+        arrays = {}
+        soundex = np.array([jellyfish.soundex(name) for name in names], dtype=str)
+        arrays['soundex'] = soundex
+        arrays['lengths'], arrays['counts'] = _char_counts(names, alphabet)
+        arrays['prefixes'] = _prefixes(names)
+        arrays['always'] = np.array([not _is_simple(name) for name in names], dtype=bool)
+
+        # Critères exacts : Soundex du nom complet et ensemble de mots identique
+        arrays['soundex_order'] = np.argsort(soundex, kind='stable').astype(np.int64)
+        arrays['soundex_keys'] = soundex[arrays['soundex_order']]
+        words = [name.split() for name in names]
+        wordsets = np.fromiter((_wordset_key(w) for w in words), dtype=np.int64, count=len(names))
+        arrays['wordset_order'] = np.argsort(wordsets, kind='stable').astype(np.int64)
+        arrays['wordset_keys'] = wordsets[arrays['wordset_order']]
+
+        # Vocabulaire des mots (noms d'au moins deux mots) pour l'inversion prénom/nom,
+        # lignes de chaque mot au format CSR : postings[postings_offsets[t]:postings_offsets[t + 1]]
+        tokens = {}
+        for i, name_words in enumerate(words):
+            if len(name_words) >= 2:
+                for word in set(name_words):
+                    tokens.setdefault(word, []).append(i)
+        vocabulary = sorted(tokens)
+        arrays['vocabulary'] = np.array(vocabulary, dtype=str)
+        arrays['postings_offsets'] = np.concatenate(
+            [[0], np.cumsum([len(tokens[word]) for word in vocabulary], dtype=np.int64)]).astype(np.int64)
+        arrays['postings'] = np.array([i for word in vocabulary for i in tokens[word]], dtype=np.int64)
+        arrays['vocab_lengths'], arrays['vocab_counts'] = _char_counts(vocabulary, alphabet)
+        arrays['vocab_prefixes'] = _prefixes(vocabulary)
+        arrays['vocab_always'] = np.array([not _is_simple(word) for word in vocabulary], dtype=bool)
+        return arrays
+
+    def to_arrays(self):
+        """Tableaux à enregistrer sur disque (voir export_watchlist)"""
+        return {attr: getattr(self, attr) for attr in self.ARRAYS}
+
+    def _query_counts(self, name):
+        cols, values = [], []
+        for c, n in zip(*np.unique(list(name), return_counts=True)):
+            if c in self.alphabet:
+                cols.append(self.alphabet[c])
+                values.append(n)
+        return np.array(cols, dtype=np.int64), np.array(values, dtype=np.uint16)
+
+    def _bounds(self, name, lengths, counts, prefixes, always):
+        """Majorant de Jaro-Winkler et minorant de Levenshtein pour chaque ligne"""
+        cols, values = self._query_counts(name)
+        common = np.minimum(counts[:, cols], values).sum(axis=1, dtype=np.int64)
+        longest = np.maximum(lengths, len(name))
+        lev_low = longest - common
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            jaro_up = np.where(common > 0, (common / len(name) + common / lengths + 1) / 3, 0.0)
+        query_prefix = np.zeros(4, dtype=np.uint32)
+        for j, c in enumerate(name[:4]):
+            query_prefix[j] = ord(c)
+        same = (prefixes == query_prefix) & (query_prefix != 0)
+        prefix_len = np.cumprod(same, axis=1).sum(axis=1)
+        jw_up = jaro_up + prefix_len * 0.1 * (1 - jaro_up)
+        return jw_up, lev_low, always | (not _is_simple(name))
+
+    def candidates(self, input_proc):
+        """Positions (dans la liste des noms) à évaluer avec is_similar_processed"""
+        if self.size == 0:
+            return np.zeros(0, dtype=np.int64)
+        if not input_proc:
+            return np.arange(self.size)
+
+        # Jaro-Winkler et Levenshtein : seuils dépendant de la longueur du nom le plus court
+        jw_up, lev_low, unbounded = self._bounds(input_proc, self.lengths, self.counts,
+                                                 self.prefixes, self.always)
+        short = np.minimum(self.lengths, len(input_proc)) < 8
+        keep = unbounded | (jw_up > np.where(short, 0.65, 0.75)) | (lev_low < np.where(short, 4, 5))
+
+        # Soundex identique
+        keep[_bucket(self.soundex_keys, self.soundex_order, jellyfish.soundex(input_proc))] = True
+
+        # Inversion : mêmes mots, ou au moins un couple de mots proches (Jaro-Winkler > 0.75)
+        words = input_proc.split()
+        keep[_bucket(self.wordset_keys, self.wordset_order, _wordset_key(words))] = True
+        if len(words) >= 2 and len(self.vocabulary):
+            close = np.zeros(len(self.vocabulary), dtype=bool)
+            for word in set(words):
+                jw_up, _, unbounded = self._bounds(word, self.vocab_lengths, self.vocab_counts,
+                                                   self.vocab_prefixes, self.vocab_always)
+                for t in np.flatnonzero(~close & (unbounded | (jw_up > 0.75))):
+                    if jellyfish.jaro_winkler_similarity(word, self.vocabulary[t]) > 0.75:
+                        close[t] = True
+            offsets = self.postings_offsets
+            for t in np.flatnonzero(close):
+                keep[self.postings[offsets[t]:offsets[t + 1]]] = True
+
+        return np.flatnonzero(keep)
 
-# 📂 Chargement de la base AML et vérification du nom
+# 🎯 Noms de la liste correspondant à un nom prétraité (indices dans names, nombre de candidats évalués)
+def match_processed(input_proc, names, index):
+    candidates = index.candidates(input_proc)
+    if logger.isEnabledFor(logging.DEBUG):
+        return [i for i in candidates if is_similar_processed(input_proc, names[i])], len(candidates)
+
+    # Soundex de la liste déjà calculé au chargement ; noms et codes des seuls candidats en str Python
+    input_soundex, input_words = jellyfish.soundex(input_proc), input_proc.split()
+    targets = names[candidates].tolist() if isinstance(names, np.ndarray) else [names[i] for i in candidates]
+    hits = [i for i, target, code in zip(candidates.tolist(), targets, index.soundex[candidates].tolist())
+            if _is_similar_tiered(input_proc, input_soundex, input_words, target, code)]
+    return hits, len(candidates)
+
+# 📝 Résumé d'une vérification : lignes parcourues, candidats évalués, durée
+def _log_summary(label, names_checked, rows_scanned, candidates_scored, matches, started):
+    if logger.isEnabledFor(logging.INFO):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info("%s: %d nom(s), %d lignes parcourues, %d candidats évalués, %d match(s) en %.1f ms",
+                    label, names_checked, rows_scanned, candidates_scored, matches, elapsed_ms,
+                    extra={"names_checked": names_checked, "rows_scanned": rows_scanned,
+                           "candidates_scored": candidates_scored, "matches": matches,
+                           "elapsed_ms": elapsed_ms})
+
+# ⚙️ Vérification en lot dans un processus secondaire
+_worker_names = None
+_worker_index = None
+
+def _init_batch_worker(names, index):
+    global _worker_names, _worker_index
+    _worker_names, _worker_index = names, index
+
+def _match_chunk(chunk):
+    return [match_processed(input_proc, _worker_names, _worker_index) for input_proc in chunk]
+
+# 📦 Copie en mémoire de la base AML (noms déjà prétraités)
+class WatchlistSnapshot:
+    def __init__(self, df, mtime, version):
+        """Prétraite une seule fois les noms de la base chargée"""
+        self.df = df
+        self.mtime = mtime
+        self.version = version  # empreinte SHA-256 du contenu du fichier
+        self.n_rows = len(df)
+        self.has_name_column = "Full Name" in df.columns
+        positions, names = [], []
+        if self.has_name_column:
+            for pos, value in enumerate(df["Full Name"].tolist()):
+                full_name = str(value).strip()
+                if full_name:  # éviter les lignes vides
+                    positions.append(pos)
+                    names.append(normalize_name(full_name))
+        self.positions = positions
+        self.names = names
+        self.index = WatchlistIndex(names)
+
+    @property
+    def columns(self):
+        return self.df.columns.tolist()
+
+    def rows(self, positions):
+        """Lignes d'origine de la base (positions dans le fichier)"""
+        return self.df.iloc[positions]
+
+    def __len__(self):
+        return len(self.names)
+
+# 💾 Base AML au format colonnes, projetée en mémoire (pages partagées entre workers)
+class MappedWatchlistSnapshot:
+    def __init__(self, directory, mtime):
+        """Projette en mémoire les fichiers produits par export_watchlist"""
+        with open(os.path.join(directory, "manifest.json"), encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("format") != WATCHLIST_FORMAT_VERSION:
+            raise ValueError(f"Format de base AML non supporté : {manifest.get('format')}")
+
+        def load(name):
+            return np.load(os.path.join(directory, name), mmap_mode='r')
+
+        self.directory = directory
+        self.mtime = mtime
+        self.version = manifest["source_sha256"]
+        self.has_name_column = manifest["has_name_column"]
+        self.n_rows = manifest["rows"]
+        self._columns = [(column["name"], load(column["file"]),
+                          load(column["nulls"]) if column["nulls"] else None)
+                         for column in manifest["columns"]]
+        self.names, self.positions, self.index = _map_index(directory, manifest)
+
+    @property
+    def columns(self):
+        return [name for name, _, _ in self._columns]
+
+    def rows(self, positions):
+        """Reconstruit uniquement les lignes demandées"""
+        positions = np.asarray(positions, dtype=np.int64)
+        data = {}
+        for name, values, nulls in self._columns:
+            selected = values[positions]
+            if nulls is not None:
+                selected = [np.nan if null else str(value) for value, null in zip(selected, nulls[positions])]
+            data[name] = selected
+        return pd.DataFrame(data, index=positions, columns=self.columns)
+
+    def __len__(self):
+        return len(self.names)
+
+# 💾 Conversion de la base Excel au format colonnes
+def export_watchlist(source_path, target_dir=None):
+    """Écrit la base, ses noms prétraités et ses clés phonétiques dans un dossier de fichiers .npy"""
+    target_dir = target_dir or os.path.splitext(source_path)[0] + WATCHLIST_DIR_SUFFIX
+    with open(source_path, 'rb') as f:
+        content = f.read()
+    snapshot = WatchlistSnapshot(pd.read_excel(io.BytesIO(content)), None, hashlib.sha256(content).hexdigest())
+
+    tmp_dir = f"{target_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    # Colonnes d'origine : types numériques conservés, le reste en texte + masque des valeurs vides
+    columns = []
+    for i, name in enumerate(snapshot.df.columns):
+        series = snapshot.df[name]
+        entry = {"name": name if isinstance(name, str) else str(name), "file": f"col_{i}.npy", "nulls": None}
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            values = series.to_numpy()
+        else:
+            nulls = series.isna().to_numpy()
+            values = np.array(['' if null else str(v) for v, null in zip(series.tolist(), nulls)], dtype=str)
+            entry["nulls"] = f"col_{i}_nulls.npy"
+            np.save(os.path.join(tmp_dir, entry["nulls"]), nulls)
+        np.save(os.path.join(tmp_dir, entry["file"]), values)
+        columns.append(entry)
+
+    _save_index(tmp_dir, snapshot.names, snapshot.positions, snapshot.index)
+    manifest = {
+        "format": WATCHLIST_FORMAT_VERSION,
+        "source": os.path.basename(source_path),
+        "source_sha256": snapshot.version,
+        "rows": snapshot.n_rows,
+        "has_name_column": snapshot.has_name_column,
+        "columns": columns,
+        "alphabet": list(snapshot.index.alphabet),
+    }
+    with open(os.path.join(tmp_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    # Remplacement du dossier : les workers gardent leurs projections de l'ancienne version
+    old_dir = f"{target_dir}.old-{os.getpid()}"
+    if os.path.exists(target_dir):
+        os.replace(target_dir, old_dir)
+    os.replace(tmp_dir, target_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return target_dir
+
+# 💾 Noms prétraités, positions et tableaux de l'index de présélection (.npy)
+def _save_index(directory, names, positions, index):
+    np.save(os.path.join(directory, "names.npy"), np.array(names, dtype=str))
+    np.save(os.path.join(directory, "positions.npy"), np.array(positions, dtype=np.int64))
+    for attr, values in index.to_arrays().items():
+        np.save(os.path.join(directory, f"{attr}.npy"), values)
+
+def _map_index(directory, manifest):
+    """Projette en mémoire les noms, positions et l'index écrits par _save_index"""
+    def load(name):
+        return np.load(os.path.join(directory, name), mmap_mode='r')
+    names = load("names.npy")
+    index = WatchlistIndex(names, manifest["alphabet"], {attr: load(f"{attr}.npy") for attr in WatchlistIndex.ARRAYS})
+    return names, load("positions.npy"), index
+
+# 💾 Index commun de plusieurs listes projetées : construit une fois, projeté par chaque worker
+def export_combined_index(members, version, positions, base_dir=None):
+    """Dossier de l'index commun (créé s'il n'existe pas encore) ; un dossier par version des listes"""
+    base_dir = base_dir or AML_COMBINED_INDEX_DIR or os.path.dirname(os.path.abspath(members[0][1].directory))
+    lists_key = hashlib.sha256(";".join(name for name, _ in members).encode()).hexdigest()[:8]
+    prefix = f".aml-combined-{lists_key}-"
+    target_dir = os.path.join(base_dir, prefix + version[:16])
+    if os.path.exists(os.path.join(target_dir, "manifest.json")):
+        return target_dir
+
+    names = [str(name) for _, snapshot in members for name in snapshot.names]
+    index = WatchlistIndex(names)
+    tmp_dir = f"{target_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    _save_index(tmp_dir, names, positions, index)
+    manifest = {"format": WATCHLIST_FORMAT_VERSION, "version": version, "lists": [name for name, _ in members],
+                "alphabet": list(index.alphabet)}
+    with open(os.path.join(tmp_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    try:
+        os.replace(tmp_dir, target_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)  # un autre worker l'a écrit entre-temps
+        if not os.path.exists(os.path.join(target_dir, "manifest.json")):
+            raise
+
+    # Versions précédentes des mêmes listes : les workers gardent leurs projections jusqu'au rechargement
+    for entry in os.listdir(base_dir):
+        if entry.startswith(prefix) and entry != os.path.basename(target_dir) and ".tmp-" not in entry:
+            shutil.rmtree(os.path.join(base_dir, entry), ignore_errors=True)
+    return target_dir
+
+# 📂 Base AML chargée au démarrage et rechargée quand le fichier change
+class WatchlistStore:
+    def __init__(self, path):
+        self.path = path
+        self.snapshot = None
+        self.results = TTLCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL)
+        self._lock = threading.Lock()
+
+    def _source(self):
+        """Fichier surveillé : le manifeste pour le format colonnes, sinon le fichier Excel"""
+        if os.path.isdir(self.path):
+            return os.path.join(self.path, "manifest.json")
+        return self.path
+
+    def refresh(self):
+        """Recharge la base si la date de modification du fichier a changé"""
+        try:
+            mtime = os.path.getmtime(self._source())
+        except OSError:
+            if self.snapshot is None:
+                raise
+            return self.snapshot  # fichier momentanément absent : on garde la copie chargée
+
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot.mtime == mtime:
+            return snapshot
+
+        with self._lock:
+            if self.snapshot is None or self.snapshot.mtime != mtime:
+                try:
+                    if os.path.isdir(self.path):
+                        snapshot = MappedWatchlistSnapshot(self.path, mtime)
+                        if self.snapshot is not None and self.snapshot.version == snapshot.version:
+                            self.snapshot.mtime = mtime
+                            return self.snapshot
+                        self.snapshot = snapshot
+                        self.results.clear()
+                        print(f"✅ Base AML projetée en mémoire : {len(snapshot)} noms ({self.path})")
+                        return snapshot
+                    with open(self.path, 'rb') as f:
+                        content = f.read()
+                    version = hashlib.sha256(content).hexdigest()
+                    if self.snapshot is not None and self.snapshot.version == version:
+                        self.snapshot.mtime = mtime  # fichier touché mais contenu identique
+                        return self.snapshot
+                    df = pd.read_excel(io.BytesIO(content))
+                except Exception as e:
+                    if self.snapshot is None:
+                        raise
+                    print(f"⚠️ Rechargement de la base AML impossible, ancienne version conservée : {e}")
+                    return self.snapshot
+                self.snapshot = WatchlistSnapshot(df, mtime, version)
+                self.results.clear()
+                print(f"✅ Base AML chargée : {len(self.snapshot)} noms ({self.path})")
+            return self.snapshot
+
+    def check_name(self, input_name):
+        """Renvoie les lignes de la base similaires au nom saisi"""
+        snapshot = self.refresh()
+
+        # 🔍 Vérification du nom de colonne
+        if not snapshot.has_name_column:
+            print("❌ La colonne 'Full Name' est introuvable. Colonnes disponibles :")
+            print(snapshot.columns)
+            return pd.DataFrame()
+
+        started = time.perf_counter()
+        input_proc = preprocess(input_name)
+        key = (input_proc, snapshot.version)
+        cached = self.results.get(key)
+        if cached is not None:
+            return cached.copy()
+
+        found, scored = match_processed(input_proc, snapshot.names, snapshot.index)
+        hits = [snapshot.positions[i] for i in found]
+        _log_summary("Vérification AML", 1, len(snapshot), scored, len(hits), started)
+        result = snapshot.rows(hits) if hits else pd.DataFrame()
+        self.results.set(key, result)
+        return result.copy()
+
+    def cache_stats(self):
+        """Succès/échecs du cache de résultats (pour le dimensionner)"""
+        return self.results.stats()
+
+    def screen_batch(self, names, processes=1, chunk_size=200):
+        """Vérifie une liste de noms en une passe : une ligne par couple (nom, ligne AML)"""
+        snapshot = self.refresh()
+        names = list(names)
+        columns = ["Input Index", "Input Name", "Watchlist Row"] + snapshot.columns
+        if not snapshot.has_name_column:
+            print("❌ La colonne 'Full Name' est introuvable. Colonnes disponibles :")
+            print(snapshot.columns)
+            return pd.DataFrame(columns=columns)
+
+        # Prétraitement unique : un même client n'est évalué qu'une fois
+        started = time.perf_counter()
+        processed = [preprocess(name) for name in names]
+        unique = list(dict.fromkeys(processed))
+
+        if processes and processes > 1 and len(unique) > chunk_size:
+            chunks = [unique[i:i + chunk_size] for i in range(0, len(unique), chunk_size)]
+            with ProcessPoolExecutor(max_workers=processes, initializer=_init_batch_worker,
+                                     initargs=(snapshot.names, snapshot.index)) as pool:
+                results = [hits for chunk_hits in pool.map(_match_chunk, chunks) for hits in chunk_hits]
+        else:
+            results = [match_processed(input_proc, snapshot.names, snapshot.index) for input_proc in unique]
+        hits_by_name = {input_proc: hits for input_proc, (hits, _) in zip(unique, results)}
+        scored = sum(n for _, n in results)
+
+        input_rows, row_positions = [], []
+        for input_pos, input_proc in enumerate(processed):
+            for i in hits_by_name[input_proc]:
+                input_rows.append(input_pos)
+                row_positions.append(snapshot.positions[i])
+        _log_summary("Vérification AML en lot", len(unique), len(unique) * len(snapshot), scored,
+                     len(row_positions), started)
+        if not row_positions:
+            return pd.DataFrame(columns=columns)
+
+        matches = snapshot.rows(row_positions)
+        result = pd.DataFrame({
+            "Input Index": input_rows,
+            "Input Name": [names[pos] for pos in input_rows],
+            "Watchlist Row": matches.index,
+        })
+        return pd.concat([result, matches.reset_index(drop=True)], axis=1)
+
+# 🗃️ Plusieurs listes (sanctions, PEP, interne...) réunies dans un seul index
+class CombinedWatchlistSnapshot:
+    def __init__(self, members):
+        """members : [(nom de la liste, snapshot)] ; chaque ligne garde le nom de sa liste"""
+        self.members = members
+        self.version = hashlib.sha256(
+            ";".join(f"{name}:{snapshot.version}" for name, snapshot in members).encode()).hexdigest()
+        self.has_name_column = any(snapshot.has_name_column for _, snapshot in members)
+
+        # Identifiant global d'une ligne = décalage de sa liste + position dans sa liste
+        sizes = [snapshot.n_rows for _, snapshot in members]
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        if len(members) == 1:
+            # Une seule liste : on réutilise directement son index (pages partagées si projeté en mémoire)
+            snapshot = members[0][1]
+            self.names, self.index = snapshot.names, snapshot.index
+            self.positions = np.asarray(snapshot.positions, dtype=np.int64)
+        else:
+            self.positions = np.concatenate(
+                [np.asarray(snapshot.positions, dtype=np.int64) + offset
+                 for (_, snapshot), offset in zip(members, self.offsets)] or [np.zeros(0, dtype=np.int64)])
+            self.names = self.index = None
+            if all(isinstance(snapshot, MappedWatchlistSnapshot) for _, snapshot in members):
+                # Listes projetées : index commun exporté sur disque, pages partagées entre workers
+                try:
+                    directory = export_combined_index(members, self.version, self.positions)
+                    with open(os.path.join(directory, "manifest.json"), encoding='utf-8') as f:
+                        self.names, self.positions, self.index = _map_index(directory, json.load(f))
+                except OSError as e:
+                    print(f"⚠️ Index AML commun non exporté, construit en mémoire : {e}")
+            if self.index is None:
+                self.names = [str(name) for _, snapshot in members for name in snapshot.names]
+                self.index = WatchlistIndex(self.names)
+
+    @property
+    def columns(self):
+        columns = ["Watchlist"]
+        for _, snapshot in self.members:
+            columns += [column for column in snapshot.columns if column not in columns]
+        return columns
+
+    def rows(self, positions):
+        """Lignes d'origine, avec le nom de la liste dans la colonne Watchlist"""
+        positions = np.asarray(positions, dtype=np.int64)
+        member_ids = np.searchsorted(self.offsets, positions, side='right') - 1
+        parts = []
+        for member_id in dict.fromkeys(member_ids.tolist()):
+            name, snapshot = self.members[member_id]
+            selected = np.flatnonzero(member_ids == member_id)
+            rows = snapshot.rows(positions[selected] - self.offsets[member_id])
+            rows.insert(0, "Watchlist", name)
+            parts.append((selected, rows))
+        if len(parts) == 1:
+            return parts[0][1].reindex(columns=self.columns)
+        # Ordre des lignes demandé par l'appelant conservé
+        order = np.argsort(np.concatenate([selected for selected, _ in parts]), kind='stable')
+        combined = pd.concat([rows for _, rows in parts])
+        return combined.iloc[order].reindex(columns=self.columns)
+
+    def __len__(self):
+        return len(self.names)
+
+# 🗃️ Registre des listes AML configurées : une seule passe de vérification pour toutes les listes
+class WatchlistRegistry(WatchlistStore):
+    def __init__(self, paths):
+        self.paths = dict(paths)
+        self.stores = {name: WatchlistStore(path) for name, path in self.paths.items()}
+        self.snapshot = None
+        self.results = TTLCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL)
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Recharge les listes modifiées et reconstruit l'index commun si besoin"""
+        members = [(name, store.refresh()) for name, store in self.stores.items()]
+        snapshot = self.snapshot
+        if snapshot is not None and all(old is new for (_, old), (_, new) in zip(snapshot.members, members)):
+            return snapshot
+        with self._lock:
+            snapshot = self.snapshot
+            if snapshot is None or any(old is not new for (_, old), (_, new) in zip(snapshot.members, members)):
+                for name, member in members:
+                    if not member.has_name_column:
+                        print(f"⚠️ Liste '{name}' ignorée : colonne 'Full Name' introuvable")
+                self.snapshot = CombinedWatchlistSnapshot(members)
+                self.results.clear()
+            return self.snapshot
+
+    def matched_lists(self, input_name):
+        """Noms des listes sur lesquelles figure le nom"""
+        result = self.check_name(input_name)
+        return sorted(set(result["Watchlist"])) if not result.empty else []
+
+watchlist = WatchlistRegistry(watchlist_paths())
+
+# 📂 Vérification du nom dans les listes AML
 def check_name(input_name):
-    df = pd.read_excel(r"C:\Users\MSI\Downloads\AML-augmented.xlsx")
-
-    # 🔍 Vérification du nom de colonne
-    if "Full Name" not in df.columns:
-        print("❌ La colonne 'Full Name' est introuvable. Colonnes disponibles :")
-        print(df.columns.tolist())
-        return pd.DataFrame()
-
-    matches = []
-    for _, row in df.iterrows():
-        full_name = str(row.get("Full Name", "")).strip()
-        if full_name:  # éviter les lignes vides
-            if is_similar(input_name, full_name):
-                matches.append(row)
-    return pd.DataFrame(matches)
+    return watchlist.check_name(input_name)
+
+# 📂 Listes AML (sanctions, PEP...) sur lesquelles figure le nom
+def matched_lists(input_name):
+    return watchlist.matched_lists(input_name)
+
+# 📋 Vérification d'un fichier clients complet (signup, Clients...)
+def screen_batch(names, processes=1):
+    return watchlist.screen_batch(names, processes=processes)
+
+# 🚀 Chargement anticipé au démarrage du processus
+try:
+    watchlist.refresh()
+except Exception as e:
+    print(f"⚠️ Base AML non chargée au démarrage ({watchlist.paths}) : {e}")
 
 # 🧪 Interface utilisateur
 if __name__ == "__main__":
+    enable_diagnostics(logging.INFO)
     input_name = input("✍️ Entrez le nom à vérifier : ").strip()
     print(f"📝 Nom saisi : '{input_name}'")
 
@@ -123,7 +824,7 @@ if __name__ == "__main__":
         # Afficher toutes les colonnes disponibles
         print("Colonnes disponibles:", result.columns.tolist())
         # Afficher seulement les colonnes qui existent
-        available_cols = ['Full Name']
+        available_cols = ['Watchlist', 'Full Name']
         for col in ['Risk Category', 'Source', 'Risk Type', 'Notes']:
             if col in result.columns:
                 available_cols.append(col)
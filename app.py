@@ -14,6 +14,7 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
 from config_email import SMTP_CONFIG
+from ocr_jobs import OCRJobQueue, QueueFullError
 import random
 import string
 import re
@@ -37,8 +38,11 @@ except ImportError:
     BABEL_AVAILABLE = False
 
 try:
-    from credit_prediction import CreditPredictor
-    credit_predictor = CreditPredictor()
+    from credit_prediction import credit_predictor  # instance partagée, modèle chargé à la première prédiction
+    if os.environ.get("CREDIT_MODEL_WARMUP", "0") == "1":
+        credit_predictor.warm_up()
+    if os.environ.get("CREDIT_MODEL_WATCH", "0") != "0":
+        credit_predictor.watch_model()  # nouveau random_forest_model.pkl pris en compte sans redémarrage (chaque worker)
     CREDIT_PREDICTION_AVAILABLE = True
     print("✅ Module de prédiction de crédit chargé avec succès")
 except ImportError as e:
@@ -54,10 +58,14 @@ except ImportError as e:
                 'risk_level': 'Moyen',
                 'message': 'Analyse automatique non disponible - Demande enregistrée pour étude manuelle'
             }
+
+        predict_fast = predict_credit_approval
     credit_predictor = MockCreditPredictor()
 
 try:
-    from extraction import extraire_donnees
+    from extraction import extraire_donnees, OCRBusyError, ocr_available
+    if not ocr_available():
+        raise ImportError("Aucun moteur OCR installé (OCR_BACKEND)")
     from AML import check_name
     from deepface import DeepFace
     ADDITIONAL_MODULES_AVAILABLE = True
@@ -67,6 +75,9 @@ except ImportError as e:
     print(f"⚠️ Modules additionnels non disponibles: {e}")
     
     # Créer des fonctions mock
+    class OCRBusyError(RuntimeError):
+        pass
+
     def extraire_donnees(path):
         return "12345678", "Doe", "John", "1990-01-01"
     
@@ -107,6 +118,22 @@ mysql = MySQL(app)
 UPLOAD_FOLDER = 'static/uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Upload enregistré sous l'empreinte SHA-256 de son contenu : un renvoi du même fichier n'est pas réécrit
+def sauvegarder_upload(file, prefix="cin"):
+    contenu = file.read()
+    path = os.path.join(UPLOAD_FOLDER, f"{prefix}_{hashlib.sha256(contenu).hexdigest()}.jpg")
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(contenu)
+        os.replace(tmp_path, path)  # jamais de fichier à moitié écrit sous le nom définitif
+    else:
+        print(f"♻️ Image déjà reçue : {path}")
+    return path
+
+# File d'attente OCR : l'extraction et la vérification AML ne bloquent plus les workers web
+ocr_jobs = OCRJobQueue()
+
 # Create password reset table if not exists (idempotent)
 def _ensure_reset_table():
     try:
@@ -1239,7 +1266,7 @@ def demande_credit():
             }
 
             # 🤖 Prédiction automatique du crédit
-            prediction_result = credit_predictor.predict_credit_approval(form_data)
+            prediction_result = credit_predictor.predict_fast(form_data)
             print(f"🤖 Résultat de la prédiction pour {name}: {prediction_result}")
             
             # Insertion en base avec tous les nouveaux champs
@@ -1293,6 +1320,39 @@ def accueil():
 def index():
     return redirect(url_for('accueil'))
 
+# 🪪 Traitement d'une CIN en arrière-plan : OCR puis vérification AML
+def traiter_cin(cin_path, email_utilisateur):
+    try:
+        cin, nom, prenom, date = extraire_donnees(cin_path)
+    except ValueError:
+        return {'error_popup': "❌ This is not a Tunisian ID card. Please upload a valid document."}
+    except OCRBusyError:
+        return {'error_popup': "⏳ The ID card reader is busy. Please try again in a moment."}
+
+    nom_complet = f"{prenom} {nom}"
+    data = {
+        'cin': cin,
+        'nom': nom,
+        'prenom': prenom,
+        'date': date
+    }
+
+    # 🔍 Vérification AML
+    result = check_name(nom_complet)
+    print(f"🧪 Résultat AML pour '{nom_complet}' : {result}")
+    aml = {
+        'match': not result.empty,
+        'watchlists': sorted(set(result['Watchlist'])) if 'Watchlist' in result.columns else []
+    }
+    if aml['match']:
+        envoyer_mail(email_utilisateur, nom_complet)
+        return {'data': data, 'aml': aml,
+                'error_popup': "❌ Votre nom figure sur une liste AML. Vous ne pouvez pas obtenir un crédit."}
+    return {'data': data, 'aml': aml, 'error_popup': None}
+
+def _wants_json():
+    return request.accept_mimetypes.best == 'application/json'
+
 @app.route('/formulaire', methods=['GET', 'POST'])
 def formulaire():
     if 'user' not in session:
@@ -1301,40 +1361,61 @@ def formulaire():
     current_language = session.get('language', 'fr')
     data = None
     error_popup = None
+    job_id = None
 
     if request.method == 'POST':
         file = request.files['image']
         email_utilisateur = request.form.get('email')  # récupère l'email du formulaire
 
         if file:
-            filename = f"cin_{uuid.uuid4().hex}.jpg"
-            cin_path = os.path.join(UPLOAD_FOLDER, filename)
-            file.save(cin_path)
+            cin_path = sauvegarder_upload(file)
             session['cin_path'] = cin_path
 
+            # ⏳ Mise en file d'attente : la page interroge /formulaire/status/<job_id>
             try:
-                cin, nom, prenom, date = extraire_donnees(cin_path)
-                nom_complet = f"{prenom} {nom}"
-                data = {
-                    'cin': cin,
-                    'nom': nom,
-                    'prenom': prenom,
-                    'date': date
-                }
+                job_id = ocr_jobs.submit(traiter_cin, cin_path, email_utilisateur, owner=session['user'])
+            except QueueFullError:
+                error_popup = "⏳ The ID card reader is busy. Please try again in a moment."
+                if _wants_json():
+                    return jsonify({'status': 'failed', 'error_popup': error_popup}), 503
+
+            if job_id and _wants_json():
+                return jsonify({'job_id': job_id,
+                                'status_url': url_for('formulaire_status', job_id=job_id)}), 202
+
+    # Résultat d'un job terminé : affichage du formulaire pré-rempli
+    elif request.args.get('job'):
+        job = ocr_jobs.status(request.args['job'], owner=session['user'])
+        if job and job['status'] == 'done':
+            data, error_popup = job['result'].get('data'), job['result']['error_popup']
+        elif job and job['status'] == 'failed':
+            error_popup = "❌ The ID card could not be processed. Please try again."
+        elif job:
+            job_id = request.args['job']
+        else:
+            error_popup = "⌛ This ID card request has expired or is unknown. Please upload the card again."
 
-                # 🔍 Vérification AML
-                result = check_name(nom_complet)
-                if not result.empty:
-                    envoyer_mail(email_utilisateur, nom_complet)
-                    error_popup = "❌ Votre nom figure sur une liste AML. Vous ne pouvez pas obtenir un crédit."
-                    return render_template('formulaire.html', data=data, error_popup=error_popup, current_language=current_language)
-                print(f"🧪 Résultat AML pour '{nom_complet}' : {result}")
+    return render_template('formulaire.html', data=data, error_popup=error_popup, job_id=job_id,
+                           current_language=current_language)
 
+@app.route('/formulaire/status/<job_id>')
+def formulaire_status(job_id):
+    if 'user' not in session:
+        return jsonify({'status': 'unauthorized'}), 401
 
-            except ValueError:
-                error_popup = "❌ This is not a Tunisian ID card. Please upload a valid document."
+    job = ocr_jobs.status(job_id, owner=session['user'])
+    if job is None:
+        return jsonify({'status': 'not_found'}), 404
 
-    return render_template('formulaire.html', data=data, error_popup=error_popup, current_language=current_language)
+    response = {'job_id': job_id, 'status': job['status']}
+    if job['status'] == 'done':
+        result = job['result']
+        response.update(result.get('data') or {})
+        response['aml'] = result.get('aml')
+        response['error_popup'] = result['error_popup']
+    elif job['status'] == 'failed':
+        response['error_popup'] = "❌ The ID card could not be processed. Please try again."
+    return jsonify(response)
 
 
 @app.route('/save', methods=['POST'])
@@ -1527,6 +1608,26 @@ def admin_dashboard():
                              error="Erreur lors du chargement des statistiques",
                              current_language=current_language)
 
+# 🔁 Modèle de crédit (Admin) : état et rechargement à chaud après un déploiement
+@app.route('/admin/credit_model')
+@admin_required
+def admin_credit_model():
+    if not CREDIT_PREDICTION_AVAILABLE:
+        return jsonify({'success': False, 'message': 'Module de prédiction non disponible'}), 503
+    return jsonify(credit_predictor.model_status())
+
+@app.route('/admin/credit_model/reload', methods=['POST'])
+@admin_required
+def admin_reload_credit_model():
+    if not CREDIT_PREDICTION_AVAILABLE:
+        return jsonify({'success': False, 'message': 'Module de prédiction non disponible'}), 503
+    # Chargement et test en arrière-plan ; les demandes continuent avec le modèle actuel.
+    # ⚠️ Seul le worker qui reçoit cette requête est rechargé : avec plusieurs workers gunicorn,
+    # activer CREDIT_MODEL_WATCH pour que chacun recharge le fichier déployé.
+    credit_predictor.reload_model(background=True)
+    return jsonify({'success': True, 'message': 'Rechargement du modèle lancé (ce worker uniquement)',
+                    'worker_pid': os.getpid()}), 202
+
 # 👥 Gestion des utilisateurs (Admin) - Afficher uniquement les clients
 @app.route('/admin/users')
 @admin_required
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Extraction OCR en masse de CIN scannées (back-office) : dossier ou manifeste en entrée,
+résultats écrits au fil de l'eau en CSV ou JSONL, reprise possible après interruption
+
+    python batch_ocr.py scans/ resultats.csv --processes 4 --batch-size 16
+    python batch_ocr.py annotation.txt resultats.jsonl
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.webp')
+FIELDS = ['image', 'status', 'cin', 'nom', 'prenom', 'date_naissance', 'seconds', 'error']
+
+# 📂 Images à traiter
+def list_images(source):
+    """Dossier (parcouru récursivement) ou manifeste : liste JSON (clé 'image', cf. annotation.txt) ou un chemin par ligne"""
+    if os.path.isdir(source):
+        return sorted(os.path.join(root, name)
+                      for root, _, names in os.walk(source)
+                      for name in names if name.lower().endswith(IMAGE_EXTENSIONS))
+
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source, encoding='utf-8') as f:
+        content = f.read()
+    try:
+        entries = [entry['image'] if isinstance(entry, dict) else entry for entry in json.loads(content)]
+    except json.JSONDecodeError:
+        entries = [line.strip() for line in content.splitlines() if line.strip() and not line.startswith('#')]
+    return [entry if os.path.isabs(entry) else os.path.join(base, entry) for entry in entries]
+
+# ♻️ Reprise : images déjà présentes dans le fichier de sortie
+def completed_images(output, fmt):
+    if not os.path.exists(output):
+        return set()
+    done = set()
+    # errors='replace' : un caractère coupé en fin de fichier ne bloque pas la reprise
+    with open(output, encoding='utf-8', errors='replace', newline='') as f:
+        if fmt == 'csv':
+            for row in csv.DictReader(f):
+                # Une ligne tronquée a des colonnes manquantes (None) : l'image sera retraitée
+                if row.get('status') in ('ok', 'rejected') and row.get('error') is not None:
+                    done.add(row['image'])
+        else:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # dernière ligne tronquée par l'interruption
+                if row.get('status') in ('ok', 'rejected'):
+                    done.add(row['image'])
+    return done
+
+class ResultWriter:
+    """Écrit chaque résultat dès qu'il arrive (ajout en fin de fichier, vidé à chaque ligne)"""
+
+    def __init__(self, output, fmt):
+        self.fmt = fmt
+        new_file = not os.path.exists(output) or os.path.getsize(output) == 0
+        if not new_file:
+            with open(output, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                truncated = f.read(1) != b'\n'
+        self._file = open(output, 'a', encoding='utf-8', newline='')
+        if not new_file and truncated:
+            self._file.write('\n')  # la ligne incomplète est isolée, l'image sera retraitée
+        if fmt == 'csv':
+            self._csv = csv.DictWriter(self._file, fieldnames=FIELDS)
+            if new_file:
+                self._csv.writeheader()
+
+    def write(self, record):
+        if self.fmt == 'csv':
+            self._csv.writerow(record)
+        else:
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+# 🧠 Traitement d'un lot d'images (dans le processus courant ou un worker)
+def _init_worker():
+    import extraction
+    extraction.OCR_VERBOSE = False
+    extraction.reader_pool = extraction.ReaderPool(size=1)  # un lecteur par processus
+    extraction.reader_pool.warm_up()
+
+def process_batch(paths, mode):
+    import extraction
+    records = []
+    for path in paths:
+        record = dict.fromkeys(FIELDS, "")
+        record['image'] = path
+        start = time.perf_counter()
+        try:
+            cin, nom, prenom, date = extraction.extraire_donnees(path, mode=mode)
+            record.update(status='ok', cin=cin, nom=nom, prenom=prenom, date_naissance=date)
+        except ValueError as e:
+            record.update(status='rejected', error=str(e))
+        except Exception as e:
+            record.update(status='error', error=f"{type(e).__name__}: {e}")
+        record['seconds'] = round(time.perf_counter() - start, 3)
+        records.append(record)
+    return records
+
+def run_batch(source, output, batch_size=16, processes=1, mode="regions", fmt=None):
+    fmt = fmt or ('jsonl' if output.endswith(('.jsonl', '.json')) else 'csv')
+    images = list_images(source)
+    done = completed_images(output, fmt)
+    todo = [path for path in images if path not in done]
+    print(f"📂 {len(images)} images, {len(images) - len(todo)} déjà traitées, {len(todo)} à traiter")
+
+    batches = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+    writer = ResultWriter(output, fmt)
+    counts = {'ok': 0, 'rejected': 0, 'error': 0}
+    start = time.perf_counter()
+
+    def report(records):
+        for record in records:
+            writer.write(record)
+            counts[record['status']] += 1
+        processed = sum(counts.values())
+        elapsed = time.perf_counter() - start
+        print(f"⏱️ {processed}/{len(todo)} images | {processed / elapsed:.2f} image/s | "
+              f"✅ {counts['ok']} ⚠️ {counts['rejected']} ❌ {counts['error']}")
+
+    try:
+        if processes <= 1:
+            _init_worker()
+            for batch in batches:
+                report(process_batch(batch, mode))
+        else:
+            # Au plus deux lots en vol par processus : la sortie avance au rythme du traitement
+            with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as pool:
+                pending = set()
+                for batch in batches:
+                    pending.add(pool.submit(process_batch, batch, mode))
+                    if len(pending) >= 2 * processes:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            report(future.result())
+                for future in pending:
+                    report(future.result())
+    finally:
+        writer.close()
+
+    print(f"🏁 Terminé en {time.perf_counter() - start:.1f}s → {output}")
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extraction OCR en masse de CIN")
+    parser.add_argument("source", help="dossier d'images ou manifeste (JSON ou un chemin par ligne)")
+    parser.add_argument("output", help="fichier de sortie .csv ou .jsonl (complété en cas de reprise)")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--processes", type=int, default=1, help="processus OCR en parallèle")
+    parser.add_argument("--mode", choices=["regions", "page"], default=os.environ.get("OCR_MODE", "regions"))
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None)
+    args = parser.parse_args(argv)
+    run_batch(args.source, args.output, args.batch_size, args.processes, args.mode, args.format)
+
+if __name__ == "__main__":
+    sys.exit(main())
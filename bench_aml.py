@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks de la vérification AML sur une liste synthétique
+"""
+
+import random
+import sys
+import time
+
+import jellyfish
+
+from AML import WatchlistIndex, is_similar_processed, match_processed, preprocess, similarity_details
+from AML import _is_similar_tiered
+
+FIRST_NAMES = ["mohamed", "ahmed", "ali", "oumeyma", "sarah", "john", "fatma", "youssef", "amira",
+               "karim", "leila", "omar", "nour", "hedi", "salma", "walid", "ines", "mehdi", "rania",
+               "sami", "james", "maria", "david", "anna", "hamza", "khalil", "mariem", "aziz"]
+LAST_NAMES = ["ben ali", "trabelsi", "sokkeh", "smith", "johnson", "hassan", "jlassi", "gharbi",
+              "bouazizi", "mansour", "chaabane", "hammami", "dridi", "ayari", "brown", "garcia",
+              "khelifi", "mejri", "zouari", "ben salah", "saidi", "baccouche", "rezgui", "ferjani"]
+ARABIC_NAMES = ["محمد الطرابلسي", "أحمد بن علي", "فاطمة الغربي", "يوسف المنصوري", "ليلى الجلاصي"]
+# Noms vocalisés (harakat) : après translittération, les voyelles restent accrochées aux lettres latines
+MARKED_ARABIC_NAMES = ["مُحَمَّد", "أَحْمَد بْن عَلِي", "فَاطِمَة", "يُوسُف الْمَنْصُورِي", "عُمَر"]
+ARABIC_MARKS = [chr(c) for c in range(0x064B, 0x0653)]
+
+def _add_marks(name, rng):
+    """Ajoute des voyelles arabes (U+064B–U+0652) après quelques lettres"""
+    return "".join(c + (rng.choice(ARABIC_MARKS) if c.isalpha() and rng.random() < 0.4 else "") for c in name)
+
+def _typo(name, rng):
+    """Introduit une faute de frappe (suppression, substitution ou inversion de lettres)"""
+    if len(name) < 3:
+        return name
+    i = rng.randrange(len(name) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return name[:i] + name[i + 1:]
+    if kind == 1:
+        return name[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + name[i + 1:]
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+def synthetic_names(n, seed=42):
+    """Génère n noms complets réalistes (avec variantes, fautes et quelques noms arabes)"""
+    rng = random.Random(seed)
+    names = []
+    for _ in range(n):
+        r = rng.random()
+        if r < 0.02:
+            names.append(rng.choice(ARABIC_NAMES))
+            continue
+        if r < 0.04:
+            names.append(rng.choice(MARKED_ARABIC_NAMES))
+            continue
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if r < 0.3:
+            name = _typo(name, rng)
+        elif r < 0.4:
+            name = f"{rng.choice(FIRST_NAMES)} {name}"
+        elif r < 0.45:
+            name = " ".join(reversed(name.split()))
+        name = name.title()
+        if r > 0.95:
+            name = _add_marks(name, rng)
+        names.append(name)
+    return names
+
+def synthetic_queries(n, seed=7):
+    """Noms de clients à vérifier : noms proches de la liste et noms sans rapport"""
+    rng = random.Random(seed)
+    queries = synthetic_names(n, seed)
+    for i in range(0, n, 3):
+        queries[i] = "".join(rng.choice("bcdfgklmnprstvz") for _ in range(rng.randint(5, 9))) + " " + \
+                     "".join(rng.choice("aeiouxyqw") for _ in range(rng.randint(3, 8)))
+    queries[0] = ""
+    return queries
+
+def brute_force_matches(input_proc, names):
+    """Parcours complet avec tous les critères (référence, indépendante du calcul par paliers)"""
+    return [i for i, name in enumerate(names) if similarity_details(input_proc, name)['match']]
+
+def indexed_matches(input_proc, names, index):
+    return match_processed(input_proc, names, index)[0]
+
+def bench_index_recall(list_size=5000, n_queries=60):
+    """Rappel de la présélection par rapport au parcours complet, et gain de temps"""
+    names = [preprocess(n) for n in synthetic_names(list_size)]
+    queries = [preprocess(q) for q in synthetic_queries(n_queries)]
+
+    start = time.perf_counter()
+    index = WatchlistIndex(names)
+    build_time = time.perf_counter() - start
+
+    brute_time = indexed_time = 0.0
+    total_matches = found_matches = total_candidates = 0
+    missed = []
+    for query in queries:
+        start = time.perf_counter()
+        expected = set(brute_force_matches(query, names))
+        brute_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = set(indexed_matches(query, names, index))
+        indexed_time += time.perf_counter() - start
+        candidates = set(index.candidates(query).tolist())
+
+        total_candidates += len(candidates)
+        total_matches += len(expected)
+        found_matches += len(expected & candidates)
+        if expected - candidates or found != expected:
+            missed.append(query)
+
+    recall = found_matches / total_matches if total_matches else 1.0
+    print(f"📊 Liste: {list_size} noms | Requêtes: {len(queries)} | Index construit en {build_time:.2f}s")
+    print(f"   Rappel de la présélection: {recall:.2%} ({found_matches}/{total_matches} matches)")
+    print(f"   Candidats évalués: {total_candidates / (len(queries) * list_size):.1%} de la liste")
+    print(f"   Parcours complet: {brute_time / len(queries) * 1000:.1f} ms/nom | "
+          f"Avec index: {indexed_time / len(queries) * 1000:.1f} ms/nom")
+    if missed:
+        print(f"❌ Matches perdus pour: {missed}")
+    return recall, missed
+
+def bench_tiered_scoring(list_size=100000, n_queries=5):
+    """Score complet (tous les critères) contre score avec arrêt anticipé, décisions identiques"""
+    names = [preprocess(n) for n in synthetic_names(list_size)]
+    queries = [preprocess(q) for q in synthetic_queries(n_queries + 1)[1:]]
+
+    index = WatchlistIndex(names)
+
+    full_time = tiered_time = loaded_time = 0.0
+    differences = 0
+    for query in queries:
+        start = time.perf_counter()
+        expected = [similarity_details(query, name)['match'] for name in names]
+        full_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        decisions = [is_similar_processed(query, name) for name in names]
+        tiered_time += time.perf_counter() - start
+        differences += sum(a != b for a, b in zip(expected, decisions))
+
+        # Même pipeline avec le Soundex de la liste précalculé (chemin de check_name)
+        start = time.perf_counter()
+        query_soundex, query_words = jellyfish.soundex(query), query.split()
+        decisions = [_is_similar_tiered(query, query_soundex, query_words, name, code)
+                     for name, code in zip(names, index.soundex.tolist())]
+        loaded_time += time.perf_counter() - start
+        differences += sum(a != b for a, b in zip(expected, decisions))
+
+    comparisons = len(queries) * list_size
+    print(f"📊 Liste: {list_size} noms | Requêtes: {len(queries)} | Comparaisons: {comparisons}")
+    print(f"   Score complet: {full_time / comparisons * 1e6:.2f} µs/comparaison")
+    print(f"   Arrêt anticipé: {tiered_time / comparisons * 1e6:.2f} µs/comparaison "
+          f"(x{full_time / tiered_time:.1f})")
+    print(f"   Arrêt anticipé, liste précalculée: {loaded_time / comparisons * 1e6:.2f} µs/comparaison "
+          f"(x{full_time / loaded_time:.1f})")
+    print(f"   Décisions différentes: {differences}")
+    return differences
+
+if __name__ == "__main__":
+    mode = sys.argv[1] if len(sys.argv) > 1 else "index"
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    if mode == "scoring":
+        bench_tiered_scoring(size or 100000)
+    else:
+        bench_index_recall(size or 5000)
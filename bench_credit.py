@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks de la prédiction de crédit sur des demandes synthétiques
+
+    python bench_credit.py [batch|latency] [nombre de demandes]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+from create_random_forest_model import create_sample_data, encode_categorical_features
+from credit_prediction import EXPECTED_FEATURES, VOCABULARY, CreditPredictor, ModelRegistry, vocabulary_path
+
+def sample_forms(n, seed=42):
+    """Demandes au format du formulaire (valeurs texte), tirées des données d'entraînement synthétiques"""
+    df = create_sample_data()
+    df = df.sample(n, replace=n > len(df), random_state=seed)
+    return [{key: str(value) for key, value in row.items() if key != 'Credit_Score'}
+            for row in df.to_dict('records')]
+
+def train_model(path, n_estimators=100, max_depth=10):
+    """Forêt entraînée comme dans create_random_forest_model.py, sauvegardée dans path"""
+    df = encode_categorical_features(create_sample_data())
+    model = RandomForestRegressor(n_estimators=n_estimators, max_depth=max_depth, random_state=42, n_jobs=-1)
+    model.fit(df[EXPECTED_FEATURES], df['Credit_Score'])
+    joblib.dump(model, path)
+    VOCABULARY.save(vocabulary_path(path))
+    return model
+
+def bench_batch(n=2000):
+    """Une prédiction par demande contre predict_batch, résultats identiques"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "random_forest_model.pkl")
+        train_model(path)
+        predictor = CreditPredictor(path, registry=ModelRegistry())
+        predictor.warm_up()
+        forms = sample_forms(n)
+
+        # Les affichages de chaque prédiction ne sont pas comptés
+        stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+        try:
+            start = time.perf_counter()
+            expected = [predictor.predict_credit_approval(form) for form in forms]
+            loop_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            results = predictor.predict_batch(forms)
+            batch_time = time.perf_counter() - start
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+
+    differences = sum(a != b for a, b in zip(expected, results))
+    print(f"📊 {n} demandes")
+    print(f"   Une par une: {loop_time:.2f}s ({loop_time / n * 1000:.2f} ms/demande)")
+    print(f"   predict_batch: {batch_time:.3f}s ({batch_time / n * 1000:.3f} ms/demande, x{loop_time / batch_time:.0f})")
+    print(f"   Résultats différents: {differences}")
+    return differences
+
+def _percentiles(timings):
+    p50, p99 = np.percentile(np.array(timings) * 1000, [50, 99])
+    return f"p50 {p50:.2f} ms | p99 {p99:.2f} ms"
+
+def bench_latency(n=500):
+    """Latence d'une demande interactive : predict_credit_approval contre predict_fast"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "random_forest_model.pkl")
+        train_model(path)
+        predictor = CreditPredictor(path, registry=ModelRegistry())
+        predictor.warm_up()
+        forms = sample_forms(n)
+
+        stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+        try:
+            slow, fast, differences = [], [], 0
+            for form in forms:
+                start = time.perf_counter()
+                expected = predictor.predict_credit_approval(form)
+                slow.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                result = predictor.predict_fast(form)
+                fast.append(time.perf_counter() - start)
+                differences += result != expected
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+
+    print(f"📊 {n} demandes, une à la fois")
+    print(f"   predict_credit_approval: {_percentiles(slow)}")
+    print(f"   predict_fast: {_percentiles(fast)}")
+    print(f"   Résultats différents: {differences}")
+    return differences
+
+if __name__ == "__main__":
+    mode = sys.argv[1] if len(sys.argv) > 1 else "batch"
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    if mode == "latency":
+        bench_latency(size or 500)
+    else:
+        bench_batch(size or 2000)
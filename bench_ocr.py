@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de l'extraction CIN : temps OCR et exactitude des champs selon le moteur OCR,
+avec et sans prétraitement
+
+    python bench_ocr.py [image] [easyocr,tesseract]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import cv2
+import numpy as np
+
+from card_preprocessing import preprocess_card
+from ocr_backends import BACKENDS, backend_available
+
+SAMPLE_IMAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "id_card_sample.png")
+
+# Vérité terrain de id_card_sample.png (texte brut, mis en forme comme le fait extraire_donnees)
+SAMPLE_FIELDS = {
+    'cin': "08002808",
+    'nom': "نايلي",
+    'prenom': "حسن",
+    'date_naissance': "24 جويلية 1976",
+}
+
+def synthetic_photo(card_path=SAMPLE_IMAGE, size=(3000, 4000), seed=0):
+    """Simule une photo de téléphone : carte inclinée, en perspective, sur un fond texturé"""
+    rng = np.random.default_rng(seed)
+    card = cv2.imread(card_path)
+    h, w = card.shape[:2]
+    width, height = size
+
+    background = rng.integers(40, 90, (height // 8, width // 8, 3), dtype=np.uint8)
+    background = cv2.resize(cv2.GaussianBlur(background, (5, 5), 0), (width, height))
+
+    # Carte sur ~60% de la largeur, légèrement tournée et déformée
+    card_w = 0.6 * width
+    card_h = card_w * h / w
+    cx, cy = width / 2, height / 2
+    angle = np.deg2rad(rng.uniform(-12, 12))
+    rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+    corners = np.array([[-card_w, -card_h], [card_w, -card_h], [card_w, card_h], [-card_w, card_h]]) / 2
+    corners = corners @ rotation.T + [cx, cy] + rng.uniform(-0.03, 0.03, (4, 2)) * card_w
+
+    source = np.array([[0, 0], [w - 1, 0], [w - 1, h - 1], [0, h - 1]], dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(source, corners.astype(np.float32))
+    warped = cv2.warpPerspective(card, matrix, (width, height), flags=cv2.INTER_CUBIC)
+    mask = cv2.warpPerspective(np.full((h, w), 255, np.uint8), matrix, (width, height))
+    return np.where(mask[..., None] > 0, warped, background), corners
+
+def _expected_fields():
+    from extraction import fix_arabic, formater_date
+    return (SAMPLE_FIELDS['cin'], fix_arabic(SAMPLE_FIELDS['nom']), fix_arabic(SAMPLE_FIELDS['prenom']),
+            formater_date(SAMPLE_FIELDS['date_naissance']))
+
+def bench_preprocessing(images, runs=5):
+    """Temps du prétraitement seul et nombre de pixels envoyés à l'OCR"""
+    for label, image in images.items():
+        start = time.perf_counter()
+        for _ in range(runs):
+            card, aligned = preprocess_card(image)
+        elapsed = (time.perf_counter() - start) / runs
+        h, w = image.shape[:2]
+        print(f"🖼️ {label}: {w}x{h} → {card.shape[1]}x{card.shape[0]} "
+              f"({'carte redressée' if aligned else 'carte non trouvée'}) en {elapsed * 1000:.1f} ms | "
+              f"pixels OCR: {card.shape[0] * card.shape[1] / (h * w):.0%}")
+
+def bench_ocr(images, backend, modes=(("sans prétraitement", False, False, "page"),
+                             ("prétraitement", True, False, "page"),
+                             ("prétraitement + binarisation", True, True, "page"),
+                             ("zones du gabarit", True, False, "regions"))):
+    """Temps OCR et champs corrects (CIN, nom, prénom, date) pour chaque mode, avec un moteur donné"""
+    import extraction
+    from extraction import extraire_donnees
+
+    extraction.reader_pool = extraction.ReaderPool(size=1, backend=backend)
+    extraction.reader_pool.warm_up()  # le chargement du modèle n'est pas compté
+    expected = _expected_fields()
+    names = ("cin", "nom", "prenom", "date")
+    for label, image in images.items():
+        # Fichier sur disque, comme une photo envoyée par le formulaire
+        path = os.path.join(tempfile.mkdtemp(), "cin.jpg")
+        cv2.imwrite(path, image)
+        for mode, preprocess, binarize, ocr_mode in modes:
+            start = time.perf_counter()
+            try:
+                fields = extraire_donnees(path, preprocess=preprocess, binarize=binarize, mode=ocr_mode)
+            except ValueError as e:
+                fields = (None,) * 4
+                print(f"   ⚠️ {e}")
+            elapsed = time.perf_counter() - start
+            correct = [name for name, got, want in zip(names, fields, expected) if got == want]
+            print(f"📊 {backend} | {label} | {mode}: {elapsed:.2f}s | champs corrects: {len(correct)}/4 {correct}")
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else SAMPLE_IMAGE
+    backends = sys.argv[2].split(",") if len(sys.argv) > 2 else list(BACKENDS)
+    images = {"scan": cv2.imread(path), "photo simulée": synthetic_photo(path)[0]}
+    bench_preprocessing(images)
+
+    available = [name for name in backends if backend_available(name)]
+    for name in set(backends) - set(available):
+        print(f"⚠️ Moteur OCR {name} non installé : ignoré")
+    for name in available:
+        bench_ocr(images, name)
+    if not available:
+        print("⚠️ Aucun moteur OCR disponible : seul le prétraitement a été mesuré")
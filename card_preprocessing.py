@@ -0,0 +1,129 @@
+"""
+Prétraitement des photos de CIN avant l'OCR : détection de la carte, redressement et mise à l'échelle
+"""
+
+import os
+import cv2
+import numpy as np
+
+# Format ID-1 (85.60 x 53.98 mm) : la carte redressée a toujours la même résolution de travail
+CARD_RATIO = 85.60 / 53.98
+CARD_WIDTH = int(os.environ.get("OCR_CARD_WIDTH", "800"))
+CARD_HEIGHT = round(CARD_WIDTH / CARD_RATIO)
+
+DETECT_WIDTH = 500       # la recherche du contour se fait sur une copie réduite
+MIN_CARD_AREA = 0.1      # la carte doit couvrir au moins 10% de la photo
+RATIO_TOLERANCE = 0.2    # écart accepté par rapport au ratio ID-1
+
+def load_image(image):
+    """Accepte un chemin ou une image déjà décodée (BGR)"""
+    if isinstance(image, np.ndarray):
+        return image
+    img = cv2.imread(image)
+    if img is None:
+        raise ValueError(f"❌ Image illisible : {image}")
+    return img
+
+def _is_card_ratio(width, height):
+    if min(width, height) <= 0:
+        return False
+    ratio = max(width, height) / min(width, height)
+    return abs(ratio - CARD_RATIO) <= RATIO_TOLERANCE * CARD_RATIO
+
+def order_corners(points):
+    """Ordonne 4 points : haut-gauche, haut-droit, bas-droit, bas-gauche (carte à l'horizontale)"""
+    pts = np.asarray(points, dtype=np.float32).reshape(4, 2)
+    center = pts.mean(axis=0)
+    angles = np.arctan2(pts[:, 1] - center[1], pts[:, 0] - center[0])
+    pts = pts[np.argsort(angles)]                # sens horaire en coordonnées image
+    pts = np.roll(pts, -int(np.argmin(pts.sum(axis=1))), axis=0)
+
+    # Carte photographiée en portrait : le grand côté doit être horizontal
+    width = np.linalg.norm(pts[1] - pts[0])
+    height = np.linalg.norm(pts[3] - pts[0])
+    if height > width:
+        pts = np.roll(pts, -1, axis=0)
+    return pts
+
+def find_card_quad(img):
+    """Cherche le quadrilatère de la carte ; renvoie ses 4 coins (coordonnées de l'image) ou None"""
+    h, w = img.shape[:2]
+    scale = min(1.0, DETECT_WIDTH / max(h, w))
+    small = cv2.resize(img, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA) \
+        if scale < 1.0 else img
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+    gray = cv2.GaussianBlur(gray, (5, 5), 0)
+    edges = cv2.dilate(cv2.Canny(gray, 50, 150), np.ones((3, 3), np.uint8))
+
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    min_area = MIN_CARD_AREA * small.shape[0] * small.shape[1]
+    for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+        area = cv2.contourArea(contour)
+        if area < min_area:
+            break
+        approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(approx) == 4 and cv2.isContourConvex(approx):
+            quad = approx.reshape(4, 2).astype(np.float32)
+        else:
+            # Coins arrondis ou abîmés : rectangle englobant si le contour le remplit bien
+            rect = cv2.minAreaRect(contour)
+            if area < 0.85 * rect[1][0] * rect[1][1]:
+                continue
+            quad = cv2.boxPoints(rect)
+        quad = order_corners(quad)
+        if _is_card_ratio(np.linalg.norm(quad[1] - quad[0]), np.linalg.norm(quad[3] - quad[0])):
+            return quad / scale
+    return None
+
+def warp_card(img, quad):
+    """Redresse la carte (correction de perspective) à la résolution de travail"""
+    target = np.array([[0, 0], [CARD_WIDTH - 1, 0], [CARD_WIDTH - 1, CARD_HEIGHT - 1],
+                       [0, CARD_HEIGHT - 1]], dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(order_corners(quad), target)
+    return cv2.warpPerspective(img, matrix, (CARD_WIDTH, CARD_HEIGHT), flags=cv2.INTER_AREA)
+
+def binarize(img):
+    """Seuillage adaptatif (éclairage inégal, reflets) : image noir et blanc"""
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 15)
+
+def preprocess_card(image, binarize_output=False):
+    """
+    Prépare la photo pour l'OCR. Renvoie (image, aligned) : aligned vaut True si l'image
+    est la carte redressée au format CARD_WIDTH x CARD_HEIGHT, False si seule une réduction
+    de la photo entière a été possible.
+    """
+    img = load_image(image)
+    h, w = img.shape[:2]
+
+    quad = find_card_quad(img)
+    if quad is not None:
+        card, aligned = warp_card(img, quad), True
+    elif _is_card_ratio(w, h) and w > h:
+        # Scan ou photo déjà recadrée : la carte occupe toute l'image
+        interpolation = cv2.INTER_AREA if w > CARD_WIDTH else cv2.INTER_CUBIC
+        card, aligned = cv2.resize(img, (CARD_WIDTH, CARD_HEIGHT), interpolation=interpolation), True
+    else:
+        # Carte introuvable : on limite seulement le nombre de pixels envoyés à l'OCR
+        scale = min(1.0, CARD_WIDTH / max(h, w))
+        card = cv2.resize(img, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA) \
+            if scale < 1.0 else img
+        aligned = False
+
+    if binarize_output:
+        card = binarize(card)
+    return card, aligned
+
+# 🗺️ Gabarit de la CIN tunisienne : zones des champs sur la carte redressée (fractions x0, x1, y0, y1)
+CIN_TEMPLATE = {
+    'cin': (0.38, 0.72, 0.30, 0.43),
+    'nom': (0.30, 0.87, 0.45, 0.56),
+    'prenom': (0.30, 0.87, 0.56, 0.67),
+    'date_naissance': (0.30, 0.84, 0.75, 0.87),
+}
+
+def field_boxes(card, template=CIN_TEMPLATE):
+    """Zones du gabarit en pixels, au format EasyOCR [x_min, x_max, y_min, y_max]"""
+    h, w = card.shape[:2]
+    return {field: [round(x0 * w), round(x1 * w), round(y0 * h), round(y1 * h)]
+            for field, (x0, x1, y0, y1) in template.items()}
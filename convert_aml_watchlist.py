@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Script pour convertir la base AML Excel au format colonnes projeté en mémoire (.watchlist)
+"""
+
+import sys
+import time
+
+from AML import AML_WATCHLIST_PATH, WatchlistStore, export_watchlist
+
+def convert_watchlist(source_path, target_dir=None):
+    """Convertit la base Excel et vérifie que le dossier produit se recharge"""
+
+    print(f"📂 Conversion de la base AML : {source_path}")
+    start = time.perf_counter()
+    target_dir = export_watchlist(source_path, target_dir)
+    print(f"💾 Dossier écrit en {time.perf_counter() - start:.2f}s : {target_dir}")
+
+    start = time.perf_counter()
+    snapshot = WatchlistStore(target_dir).refresh()
+    print(f"⚡ Rechargement par projection mémoire en {time.perf_counter() - start:.3f}s "
+          f"({len(snapshot)} noms)")
+    return target_dir
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else AML_WATCHLIST_PATH
+    target = sys.argv[2] if len(sys.argv) > 2 else None
+    convert_watchlist(source, target)
+    print("\n🎉 Base AML prête : pointez la vérification AML vers ce dossier")
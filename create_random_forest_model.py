@@ -10,6 +10,9 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 import joblib
 import os
+import sys
+
+from credit_prediction import EXPECTED_FEATURES, VOCABULARY, FlatForest, flat_forest_path, load_model, vocabulary_path
 
 def create_sample_data():
     """Crée des données d'exemple pour entraîner le modèle"""
@@ -70,47 +73,30 @@ def create_sample_data():
     return df
 
 def encode_categorical_features(df):
-    """Encode les variables catégorielles"""
-    
-    # Copie du DataFrame
-    df_encoded = df.copy()
-    
-    # Encodage manuel pour correspondre à notre système
-    month_mapping = {
-        'January': 1, 'February': 2, 'March': 3, 'April': 4, 'May': 5, 'June': 6,
-        'July': 7, 'August': 8, 'September': 9, 'October': 10, 'November': 11, 'December': 12
-    }
-    df_encoded['Month'] = df_encoded['Month'].map(month_mapping)
-    
-    occupation_mapping = {
-        'Engineer': 1, 'Teacher': 2, 'Doctor': 3, 'Lawyer': 4, 'Manager': 5,
-        'Accountant': 6, 'Developer': 7, 'Other': 8
-    }
-    df_encoded['Occupation'] = df_encoded['Occupation'].map(occupation_mapping)
-    
-    loan_type_mapping = {
-        'Auto Loan': 1, 'Personal Loan': 2, 'Home Equity Loan': 3,
-        'Mortgage Loan': 4, 'Student Loan': 5, 'Not Specified': 6
-    }
-    df_encoded['Type_of_Loan'] = df_encoded['Type_of_Loan'].map(loan_type_mapping)
-    
-    credit_mix_mapping = {'Standard': 1, 'Good': 2, 'Bad': 3}
-    df_encoded['Credit_Mix'] = df_encoded['Credit_Mix'].map(credit_mix_mapping)
-    
-    payment_min_mapping = {'Yes': 1, 'No': 0, 'NM': 2}
-    df_encoded['Payment_of_Min_Amount'] = df_encoded['Payment_of_Min_Amount'].map(payment_min_mapping)
-    
-    payment_behaviour_mapping = {
-        'High_spent_Small_value_payments': 1,
-        'Low_spent_Large_value_payments': 2,
-        'High_spent_Medium_value_payments': 3,
-        'Low_spent_Medium_value_payments': 4,
-        'High_spent_Large_value_payments': 5,
-        'Low_spent_Small_value_payments': 6
-    }
-    df_encoded['Payment_Behaviour'] = df_encoded['Payment_Behaviour'].map(payment_behaviour_mapping)
-    
-    return df_encoded
+    """Encode les variables catégorielles avec le vocabulaire utilisé en production"""
+    return VOCABULARY.transform_frame(df)
+
+def export_flat_forest(model_path='random_forest_model.pkl'):
+    """Aplatit la forêt d'un modèle sauvegardé en tableaux NumPy (dossier .flat/ à côté du modèle)"""
+
+    loaded = load_model(model_path)
+    if loaded.model is None:
+        print(f"❌ Impossible de charger {model_path}: {loaded.error}")
+        return False
+
+    forest = FlatForest.from_model(loaded.model, loaded.version)
+
+    # Vérifier que l'évaluateur donne exactement les prédictions de sklearn (load_model impose n_jobs=1)
+    X = encode_categorical_features(create_sample_data())[EXPECTED_FEATURES]
+    if not np.array_equal(forest.predict(X.to_numpy(dtype=np.float64)), loaded.model.predict(X)):
+        print("❌ La forêt aplatie ne reproduit pas les prédictions du modèle")
+        return False
+
+    output = forest.save(flat_forest_path(model_path))
+    print(f"✅ Forêt aplatie: {len(forest.roots)} arbres, {len(forest.value)} nœuds, profondeur {forest.depth}")
+    print(f"📁 Dossier: {output} ({forest.nbytes / 1024:.0f} Ko projetés en mémoire, "
+          f"modèle: {os.path.getsize(model_path) / 1024:.0f} Ko)")
+    return True
 
 def create_random_forest_model():
     """Crée et sauvegarde un modèle Random Forest"""
@@ -183,9 +169,11 @@ def create_random_forest_model():
     # Sauvegarder le modèle
     print("\n💾 Sauvegarde du modèle...")
     joblib.dump(model, 'random_forest.pkl')
+    VOCABULARY.save(vocabulary_path('random_forest.pkl'))
     
     print("✅ Modèle Random Forest créé et sauvegardé avec succès!")
     print(f"📁 Fichier: random_forest.pkl")
+    print(f"📚 Vocabulaire {VOCABULARY.version}: {vocabulary_path('random_forest.pkl')}")
     
     # Test rapide
     print("\n🧪 Test rapide du modèle...")
@@ -194,11 +182,18 @@ def create_random_forest_model():
     print(f"   Prédiction: {sample_prediction:.0f}")
     print(f"   Valeur réelle: {actual_value}")
     print(f"   Différence: {abs(sample_prediction - actual_value):.0f}")
+
+    print("\n🗜️ Export de la forêt aplatie...")
+    export_flat_forest('random_forest.pkl')
     
     return True
 
 if __name__ == "__main__":
-    success = create_random_forest_model()
+    # python create_random_forest_model.py --export [random_forest_model.pkl]
+    if len(sys.argv) > 1 and sys.argv[1] == "--export":
+        success = export_flat_forest(*sys.argv[2:3])
+    else:
+        success = create_random_forest_model()
     if success:
         print("\n🎉 Modèle prêt à être utilisé!")
     else:
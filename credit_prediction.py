@@ -1,52 +1,595 @@
+import os
+import json
+import hashlib
+import time
+import threading
 import joblib
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import warnings
+import shutil
+import contextlib
+from ttl_cache import TTLCache
+from shadow_scoring import CREDIT_SHADOW_MODEL, ShadowScorer
 warnings.filterwarnings('ignore')
 
-class CreditPredictor:
-    def __init__(self, model_path='random_forest_model.pkl'):
-        """Initialise le prédicteur de crédit avec le modèle Random Forest"""
-        self.model = None
-        self.use_fallback = False
-        
+# 🔁 Surveillance du fichier modèle : intervalle en secondes (0 = désactivée)
+CREDIT_MODEL_WATCH = float(os.environ.get("CREDIT_MODEL_WATCH", "0"))
+
+# ♻️ Cache des prédictions : une demande resoumise à l'identique n'est pas recalculée
+CREDIT_CACHE_SIZE = int(os.environ.get("CREDIT_CACHE_SIZE", "1024"))
+CREDIT_CACHE_TTL = int(os.environ.get("CREDIT_CACHE_TTL", "900"))  # secondes
+
+# 💾 Forêt aplatie exportée : dossier .flat/ (un fichier .npy par tableau + manifest.json), projeté en mémoire
+FLAT_FOREST_FORMAT_VERSION = 1
+
+# Colonnes attendues par le modèle
+EXPECTED_FEATURES = [
+    'Month', 'Age', 'Occupation', 'Annual_Income', 'Monthly_Inhand_Salary',
+    'Num_Bank_Accounts', 'Num_Credit_Card', 'Interest_Rate', 'Num_of_Loan',
+    'Type_of_Loan', 'Delay_from_due_date', 'Num_of_Delayed_Payment',
+    'Changed_Credit_Limit', 'Num_Credit_Inquiries', 'Credit_Mix',
+    'Outstanding_Debt', 'Credit_Utilization_Ratio', 'Credit_History_Age',
+    'Payment_of_Min_Amount', 'Total_EMI_per_month', 'Amount_invested_monthly',
+    'Payment_Behaviour', 'Monthly_Balance'
+]
+
+# Ligne de test pour vérifier la compatibilité d'un modèle au chargement
+SMOKE_TEST_ROW = [1, 30, 1, 50000, 4000, 2, 1, 10, 0, 1, 0, 0, 0, 1, 1, 0, 25, 5, 1, 0, 500, 1, 2000]
+
+# Encodage des variables catégorielles : correspondances et code par défaut (valeur absente ou inconnue)
+CATEGORICAL_MAPPINGS = {
+    'Month': ({
+        'January': 1, 'February': 2, 'March': 3, 'April': 4, 'May': 5, 'June': 6,
+        'July': 7, 'August': 8, 'September': 9, 'October': 10, 'November': 11, 'December': 12
+    }, 1),
+    'Occupation': ({
+        'Engineer': 1, 'Teacher': 2, 'Doctor': 3, 'Lawyer': 4, 'Manager': 5,
+        'Accountant': 6, 'Developer': 7, 'Scientist': 8, 'Architect': 9,
+        'Consultant': 10, 'Other': 11
+    }, 11),
+    'Type_of_Loan': ({
+        'Auto Loan': 1, 'Credit-Builder Loan': 2, 'Personal Loan': 3,
+        'Home Equity Loan': 4, 'Mortgage Loan': 5, 'Student Loan': 6,
+        'Debt Consolidation Loan': 7, 'Payday Loan': 8, 'Not Specified': 9
+    }, 9),
+    'Credit_Mix': ({'Standard': 1, 'Good': 2, 'Bad': 3}, 1),
+    'Payment_of_Min_Amount': ({'Yes': 1, 'No': 0, 'NM': 2}, 2),
+    'Payment_Behaviour': ({
+        'High_spent_Small_value_payments': 1,
+        'Low_spent_Large_value_payments': 2,
+        'High_spent_Medium_value_payments': 3,
+        'Low_spent_Medium_value_payments': 4,
+        'High_spent_Large_value_payments': 5,
+        'Low_spent_Small_value_payments': 6
+    }, 4),
+}
+
+# Types de crédit et de contrat du formulaire de demande
+CREDIT_TYPE_CODES = {
+    'Crédit consommation': 1,
+    'Crédit personnel': 1,
+    'Crédit auto': 2,
+    'Crédit immobilier': 3,
+    'Regroupement de crédits': 4
+}
+CONTRACT_TYPE_WEIGHTS = {
+    'CDI': 1.0,
+    'CDD': 0.8,
+    'Indépendant / Freelance': 0.6,
+    'Retraité': 0.7,
+    'Autre': 0.5
+}
+
+# Variables numériques : (valeur par défaut, entier ?)
+NUMERIC_DEFAULTS = {
+    'Age': (30, True),
+    'Annual_Income': (50000, False),
+    'Monthly_Inhand_Salary': (4000, False),
+    'Num_Bank_Accounts': (1, True),
+    'Num_Credit_Card': (0, True),
+    'Interest_Rate': (10.0, False),
+    'Num_of_Loan': (0, True),
+    'Delay_from_due_date': (0, True),
+    'Num_of_Delayed_Payment': (0, True),
+    'Changed_Credit_Limit': (0, False),
+    'Num_Credit_Inquiries': (0, True),
+    'Outstanding_Debt': (0, False),
+    'Credit_Utilization_Ratio': (25.0, False),
+    'Credit_History_Age': (5.0, False),
+    'Total_EMI_per_month': (0, False),
+    'Amount_invested_monthly': (0, False),
+    'Monthly_Balance': (1000, False),
+}
+
+# Position de chaque colonne dans le vecteur de features
+FEATURE_INDEX = {feature: i for i, feature in enumerate(EXPECTED_FEATURES)}
+
+def safe_float(value, default=0.0):
+    try:
+        return float(value) if value else default
+    except (ValueError, TypeError):
+        return default
+
+def safe_int(value, default=0):
+    try:
+        return int(value) if value else default
+    except (ValueError, TypeError):
+        return default
+
+class CategoricalVocabulary:
+    """Codes des variables catégorielles, compilés une fois et versionnés avec le modèle
+
+    Le même objet encode les données d'entraînement (create_random_forest_model.py)
+    et les demandes en production : les codes ne peuvent pas diverger.
+    """
+
+    def __init__(self, mappings):
+        self.mappings = {feature: (dict(codes), default) for feature, (codes, default) in mappings.items()}
+        content = json.dumps(self.to_dict(), sort_keys=True, ensure_ascii=False)
+        self.version = hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+        # Index des valeurs connues par colonne, pour transform
+        self._indexes = {feature: (pd.Index(list(codes)), np.array(list(codes.values()) + [default], dtype=np.float64))
+                         for feature, (codes, default) in self.mappings.items()}
+
+        # Plan d'encodage d'une ligne : (position, colonne, correspondance, défaut, analyseur numérique)
+        self.row_plan = [
+            (j, feature) + (self.mappings[feature] + (None,) if feature in self.mappings else
+                            (None, NUMERIC_DEFAULTS[feature][0],
+                             safe_int if NUMERIC_DEFAULTS[feature][1] else safe_float))
+            for j, feature in enumerate(EXPECTED_FEATURES)
+        ]
+
+    def encode(self, feature, value):
+        """Code d'une valeur (code par défaut si absente ou inconnue)"""
+        codes, default = self.mappings[feature]
+        return codes.get(value, default)
+
+    def encode_form(self, form_data):
+        """Codes de toutes les variables catégorielles d'un formulaire"""
+        return {feature: codes.get(form_data.get(feature), default)
+                for feature, (codes, default) in self.mappings.items()}
+
+    def transform(self, feature, values):
+        """Codes d'une colonne de valeurs (float64), sans boucle Python"""
+        index, codes = self._indexes[feature]
+        positions = index.get_indexer(pd.Index(values, dtype=object))
+        return codes[positions]  # -1 (inconnue) → dernier élément : le code par défaut
+
+    def transform_frame(self, df):
+        """Copie du DataFrame avec les colonnes catégorielles présentes encodées"""
+        encoded = df.copy()
+        for feature in self.mappings:
+            if feature in encoded:
+                encoded[feature] = self.transform(feature, encoded[feature].to_numpy(dtype=object)).astype(np.int64)
+        return encoded
+
+    def to_dict(self):
+        return {feature: {'codes': codes, 'default': default} for feature, (codes, default) in self.mappings.items()}
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'features': self.to_dict()}, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            content = json.load(f)
+        vocabulary = cls({feature: (entry['codes'], entry['default'])
+                          for feature, entry in content['features'].items()})
+        if vocabulary.version != content.get('version'):
+            raise ValueError(f"Vocabulaire {path} modifié (version {content.get('version')} attendue)")
+        return vocabulary
+
+# Vocabulaire par défaut (modèles sauvegardés sans fichier .vocab.json)
+VOCABULARY = CategoricalVocabulary(CATEGORICAL_MAPPINGS)
+
+class RowView:
+    """Accès par nom de colonne à une ligne encodée, sans copie"""
+
+    def __init__(self, row):
+        self.row = row
+
+    def __getitem__(self, feature):
+        return self.row[FEATURE_INDEX[feature]]
+
+class FlatForest:
+    """Forêt de régression aplatie en tableaux NumPy contigus, évaluée sans sklearn
+
+    Les nœuds de tous les arbres sont concaténés ; une feuille boucle sur elle-même,
+    ce qui permet de descendre tous les arbres en parallèle pendant `depth` itérations.
+    Les prédictions sont identiques bit à bit à celles de sklearn sur un seul thread (n_jobs=1,
+    imposé par load_model) ; avec plusieurs threads, sklearn diffère à l'arrondi près (~1e-13).
+    """
+
+    ARRAYS = ('feature', 'threshold', 'missing_left', 'left', 'right', 'value', 'roots')
+
+    def __init__(self, feature, threshold, missing_left, left, right, value, roots, depth, version=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.missing_left = missing_left
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.depth = int(depth)
+        self.version = version
+        self.has_missing = bool(missing_left.any())
+        self.checksum = None  # empreinte des tableaux exportés (manifest.json)
+
+    @classmethod
+    def from_model(cls, model, version=None):
+        """Aplatit les arbres d'un RandomForestRegressor (ou ExtraTreesRegressor) entraîné"""
+        parts = {name: [] for name in cls.ARRAYS}
+        offset, depth = 0, 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            ids = np.arange(tree.node_count)
+            leaf = tree.children_left == -1
+            parts['feature'].append(np.where(leaf, 0, tree.feature))
+            parts['threshold'].append(np.where(leaf, np.inf, tree.threshold))
+            missing_left = getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=np.uint8))
+            parts['missing_left'].append(np.asarray(missing_left, dtype=bool) & ~leaf)
+            parts['left'].append(np.where(leaf, ids, tree.children_left) + offset)
+            parts['right'].append(np.where(leaf, ids, tree.children_right) + offset)
+            parts['value'].append(tree.value[:, 0, 0])
+            parts['roots'].append([offset])
+            offset += tree.node_count
+            depth = max(depth, tree.max_depth)
+
+        dtypes = {'feature': np.int32, 'threshold': np.float64, 'missing_left': bool, 'left': np.int32,
+                  'right': np.int32, 'value': np.float64, 'roots': np.int32}
+        arrays = {name: np.ascontiguousarray(np.concatenate(parts[name]), dtype=dtypes[name]) for name in cls.ARRAYS}
+        return cls(depth=depth, version=version, **arrays)
+
+    @classmethod
+    def load(cls, directory):
+        """Projette en mémoire les fichiers .npy d'un export (pages partagées entre workers)"""
+        with open(os.path.join(directory, "manifest.json"), encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("format") != FLAT_FOREST_FORMAT_VERSION:
+            raise ValueError(f"Format de forêt aplatie non supporté : {manifest.get('format')}")
+        # np.asarray : vue ndarray sur la projection, sans le surcoût de np.memmap à chaque opération
+        arrays = {name: np.asarray(np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r'))
+                  for name in cls.ARRAYS}
+        forest = cls(depth=manifest["depth"], version=manifest["version"], **arrays)
+        forest.checksum = manifest["checksum"]
+        return forest
+
+    def save(self, directory):
+        """Écrit un dossier de fichiers .npy non compressés + manifest.json, remplacé d'un bloc"""
+        tmp_dir = f"{directory}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        checksum = hashlib.sha256()
+        for name in self.ARRAYS:
+            values = getattr(self, name)
+            checksum.update(np.ascontiguousarray(values).tobytes())
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), values)
+        manifest = {"format": FLAT_FOREST_FORMAT_VERSION, "version": self.version, "depth": self.depth,
+                    "checksum": checksum.hexdigest()[:16]}
+        with open(os.path.join(tmp_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        # Les workers gardent leurs projections de l'ancienne version jusqu'au rechargement
+        old_dir = f"{directory}.old-{os.getpid()}"
+        if os.path.exists(directory):
+            os.replace(directory, old_dir)
+        os.replace(tmp_dir, directory)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        return directory
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
+
+    def _descend(self, X32, nodes, rows):
+        for _ in range(self.depth):
+            x = X32[rows, self.feature[nodes]]
+            go_left = (x <= self.threshold[nodes]) | (np.isnan(x) & self.missing_left[nodes])
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_row(self, row32):
+        """Prédiction d'une ligne float32 (n_features,)"""
+        nodes = self.roots
+        feature, threshold, left, right = self.feature, self.threshold, self.left, self.right
+        for _ in range(self.depth):
+            x = row32.take(feature.take(nodes))
+            go_left = x <= threshold.take(nodes)
+            if self.has_missing:
+                go_left |= np.isnan(x) & self.missing_left.take(nodes)
+            nodes = np.where(go_left, left.take(nodes), right.take(nodes))
+        # cumsum additionne dans l'ordre des arbres, comme RandomForestRegressor.predict avec n_jobs=1
+        return np.cumsum(self.value[nodes])[-1] / len(self.roots)
+
+    def predict(self, X):
+        """Prédictions d'une matrice (n, n_features)"""
+        X32 = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X32))[:, np.newaxis]
+        nodes = self._descend(X32, np.broadcast_to(self.roots, (len(X32), len(self.roots))), rows)
+        return np.cumsum(self.value[nodes], axis=1)[:, -1] / len(self.roots)
+
+def vocabulary_path(model_path):
+    """Vocabulaire sauvegardé avec un modèle : random_forest_model.pkl → random_forest_model.vocab.json"""
+    return os.path.splitext(model_path)[0] + '.vocab.json'
+
+def flat_forest_path(model_path):
+    """Dossier de la forêt aplatie associé à un modèle : random_forest_model.pkl → random_forest_model.flat/"""
+    return os.path.splitext(model_path)[0] + '.flat'
+
+class LoadedModel:
+    """Artefact chargé : le modèle (None si inutilisable), sa version (empreinte du fichier) et l'erreur éventuelle"""
+
+    def __init__(self, path, model=None, version=None, error=None, forest=None, vocabulary=VOCABULARY,
+                 flat_version=None):
+        self.path = path
+        self.model = model
+        self.version = version
+        self.error = error
+        self.forest = forest
+        self.vocabulary = vocabulary
+        self.flat_version = flat_version  # empreinte de l'export .flat/ utilisé (None : aplatie en mémoire)
+
+        # Forêt de régression sans fichier exporté : aplatie en mémoire au chargement
+        if forest is None and type(model).__name__ in ('RandomForestRegressor', 'ExtraTreesRegressor') \
+                and getattr(model, 'n_outputs_', 1) == 1 and getattr(model, 'estimators_', None):
+            self.forest = FlatForest.from_model(model, version)
+
+    @property
+    def artifacts(self):
+        """Versions de tout ce qui est chargé avec le modèle : pickle, vocabulaire, forêt aplatie"""
+        return self.version, self.vocabulary.version, self.flat_version
+
+    def predict_row(self, row, row32):
+        """Prédiction d'une ligne (1, n) float64 ; row32 : tampon float32 de même forme"""
+        if self.forest is None:
+            return self.model.predict(row)[0]
+
+        # Même calcul que RandomForestRegressor.predict (n_jobs=1) : entrées en float32, moyenne des arbres dans l'ordre
+        np.copyto(row32, row, casting='unsafe')
+        return self.forest.predict_row(row32[0])
+
+def load_model(path):
+    """Charge un modèle joblib et vérifie qu'il prédit sur une ligne de test"""
+    try:
+        with open(path, 'rb') as f:
+            version = hashlib.sha256(f.read()).hexdigest()[:16]
+
+        # mmap_mode : sklearn recopie malgré tout les nœuds des arbres dans ses propres tampons ;
+        # seule la forêt aplatie exportée (.flat/) est réellement partagée entre workers
+        model = joblib.load(path, mmap_mode='r')
+        print(f"✅ Modèle Random Forest chargé depuis {path}")
+
+        # Prédiction sur un seul thread : avec n_jobs > 1, sklearn additionne les arbres dans l'ordre
+        # où les threads terminent (écarts d'arrondi d'un appel à l'autre). En séquentiel, le résultat
+        # est reproductible et identique à la forêt aplatie, quel que soit le nombre de cœurs.
+        if getattr(model, 'n_jobs', None) not in (None, 1):
+            model.n_jobs = 1
+
+        # Test rapide pour vérifier la compatibilité
+        _ = model.predict(pd.DataFrame([SMOKE_TEST_ROW], columns=EXPECTED_FEATURES))
+        print(f"✅ Test de compatibilité réussi")
+        print(f"📋 Features attendues: {len(EXPECTED_FEATURES)} colonnes")
+
+        # Vocabulaire sauvegardé à l'entraînement
+        vocabulary = VOCABULARY
+        if os.path.exists(vocabulary_path(path)):
+            vocabulary = CategoricalVocabulary.load(vocabulary_path(path))
+            print(f"📚 Vocabulaire {vocabulary.version} chargé")
+
+        # Forêt aplatie exportée par create_random_forest_model.py, utilisée si elle correspond au modèle
+        forest = flat_version = None
+        flat_path = flat_forest_path(path)
+        if os.path.isdir(flat_path):
+            forest = FlatForest.load(flat_path)
+            if forest.version != version:
+                print(f"⚠️ {flat_path} ne correspond pas au modèle, forêt aplatie recalculée")
+                forest = None
+            else:
+                flat_version = forest.checksum
+        return LoadedModel(path, model, version, forest=forest, vocabulary=vocabulary, flat_version=flat_version)
+
+    except Exception as e:
+        print(f"⚠️ Problème de compatibilité avec le modèle: {e}")
+        print(f"🔄 Activation du mode de prédiction alternatif")
+        return LoadedModel(path, error=e)
+
+class ModelRegistry:
+    """Modèles du processus : chaque fichier est chargé une seule fois, puis partagé par tous les prédicteurs"""
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self.reloads = {}  # dernier rechargement par fichier
+
+    def get(self, path):
+        key = os.path.abspath(path)
+        entry = self._models.get(key)
+        if entry is None:
+            with self._lock:
+                entry = self._models.get(key)
+                if entry is None:
+                    entry = self._models[key] = load_model(key)
+        return entry
+
+    def loaded_paths(self):
+        return list(self._models)
+
+    def reload(self, path):
+        """Charge et teste la nouvelle version du fichier, puis la substitue d'un bloc
+
+        Les prédictions en cours gardent l'ancien modèle (lu une fois par prédiction) ;
+        si le nouveau fichier est inutilisable, l'ancien reste en service.
+        """
+        key = os.path.abspath(path)
+        with self._reload_lock:  # un seul chargement à la fois
+            start = time.perf_counter()
+            current = self._models.get(key)
+            candidate = load_model(key)
+            if candidate.model is None:
+                status = 'failed'
+            elif current is not None and current.artifacts == candidate.artifacts:
+                status = 'unchanged'
+            else:
+                self._models[key] = candidate  # affectation atomique
+                status = 'swapped'
+
+            active = self._models.get(key, current)
+            self.reloads[key] = {
+                'status': status,
+                'version': active.version if active else None,
+                'previous_version': current.version if current else None,
+                'vocabulary': active.vocabulary.version if active else None,
+                'error': str(candidate.error) if candidate.error else None,
+                'seconds': round(time.perf_counter() - start, 3),
+                'at': datetime.now().isoformat(timespec='seconds')
+            }
+            print(f"🔁 Rechargement de {key}: {status} (version {self.reloads[key]['version']})")
+            return self.reloads[key]
+
+    def reload_async(self, path):
+        """Rechargement dans un thread d'arrière-plan"""
+        thread = threading.Thread(target=self.reload, args=(path,), daemon=True)
+        thread.start()
+        return thread
+
+class ModelWatcher(threading.Thread):
+    """Recharge le modèle quand son fichier, son vocabulaire ou sa forêt aplatie change (date, taille ou inode)
+
+    Le changement doit être stable sur deux relevés : un fichier en cours de copie n'est pas chargé.
+    Déployer par renommage (os.replace) évite tout fichier partiel.
+    """
+
+    def __init__(self, path, registry=None, interval=CREDIT_MODEL_WATCH or 5.0):
+        super().__init__(daemon=True, name="credit-model-watcher")
+        self.path = path
+        self.registry = registry or model_registry
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def _signature(self):
         try:
-            self.model = joblib.load(model_path)
-            print(f"✅ Modèle Random Forest chargé depuis {model_path}")
-            
-            # Test rapide pour vérifier la compatibilité
-            import pandas as pd
-            test_data = pd.DataFrame([[1, 30, 1, 50000, 4000, 2, 1, 10, 0, 1, 0, 0, 0, 1, 1, 0, 25, 5, 1, 0, 500, 1, 2000]], 
-                                   columns=['Month', 'Age', 'Occupation', 'Annual_Income', 'Monthly_Inhand_Salary',
-                                           'Num_Bank_Accounts', 'Num_Credit_Card', 'Interest_Rate', 'Num_of_Loan', 
-                                           'Type_of_Loan', 'Delay_from_due_date', 'Num_of_Delayed_Payment', 
-                                           'Changed_Credit_Limit', 'Num_Credit_Inquiries', 'Credit_Mix', 
-                                           'Outstanding_Debt', 'Credit_Utilization_Ratio', 'Credit_History_Age',
-                                           'Payment_of_Min_Amount', 'Total_EMI_per_month', 'Amount_invested_monthly', 
-                                           'Payment_Behaviour', 'Monthly_Balance'])
-            
-            # Test de prédiction
-            _ = self.model.predict(test_data)
-            print(f"✅ Test de compatibilité réussi")
-            
-            # Colonnes attendues par le modèle
-            self.expected_features = [
-                'Month', 'Age', 'Occupation', 'Annual_Income', 'Monthly_Inhand_Salary',
-                'Num_Bank_Accounts', 'Num_Credit_Card', 'Interest_Rate', 'Num_of_Loan', 
-                'Type_of_Loan', 'Delay_from_due_date', 'Num_of_Delayed_Payment', 
-                'Changed_Credit_Limit', 'Num_Credit_Inquiries', 'Credit_Mix', 
-                'Outstanding_Debt', 'Credit_Utilization_Ratio', 'Credit_History_Age',
-                'Payment_of_Min_Amount', 'Total_EMI_per_month', 'Amount_invested_monthly', 
-                'Payment_Behaviour', 'Monthly_Balance'
-            ]
-            print(f"📋 Features attendues: {len(self.expected_features)} colonnes")
-            
-        except Exception as e:
-            print(f"⚠️ Problème de compatibilité avec le modèle: {e}")
-            print(f"🔄 Activation du mode de prédiction alternatif")
-            self.model = None
-            self.use_fallback = True
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        signature = [(stat.st_mtime_ns, stat.st_size, stat.st_ino)]
+        # Le manifest.json de la forêt aplatie change d'inode à chaque export (dossier remplacé)
+        for sidecar in (vocabulary_path(self.path), os.path.join(flat_forest_path(self.path), "manifest.json")):
+            try:
+                sidecar_stat = os.stat(sidecar)
+                signature.append((sidecar_stat.st_mtime_ns, sidecar_stat.st_size, sidecar_stat.st_ino))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def run(self):
+        last = seen = self._signature()
+        while not self._stop_event.wait(self.interval):
+            signature = self._signature()
+            if signature is not None and signature != last and signature == seen:
+                self.registry.reload(self.path)
+                last = signature
+            seen = signature
+
+    def stop(self):
+        self._stop_event.set()
+
+# Registre global des modèles
+model_registry = ModelRegistry()
+
+class CreditPredictor:
+    def __init__(self, model_path='random_forest_model.pkl', registry=None, lazy=True,
+                 cache_size=CREDIT_CACHE_SIZE, cache_ttl=CREDIT_CACHE_TTL, shadow_model=CREDIT_SHADOW_MODEL,
+                 shadow_store=None):
+        """Initialise le prédicteur de crédit ; le modèle est chargé à la première prédiction (ou par warm_up)"""
+        self.model_path = model_path
+        self.registry = registry or model_registry
+        self.expected_features = EXPECTED_FEATURES
+        self._local = threading.local()
+        self._watch_interval = None
+        self._watcher = None
+        self._watcher_pid = None
+        self._watch_lock = threading.Lock()
+        self.prediction_cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._saved_seconds = 0.0
+        self._saved_lock = threading.Lock()
+
+        # Challenger en mode fantôme : score en arrière-plan, sans effet sur la décision
+        self.shadow = None
+        if shadow_model:
+            options = {'store_path': shadow_store} if shadow_store else {}
+            self.shadow = ShadowScorer(shadow_model, self.registry,
+                                       approve=lambda score: self.interpret_credit_score(score)['approved'], **options)
+        if not lazy:
+            self.warm_up()
+
+    @property
+    def loaded_model(self):
+        if self._watch_interval and self._watcher_pid != os.getpid():
+            self._start_watcher()
+        return self.registry.get(self.model_path)
+
+    @property
+    def model(self):
+        return self.loaded_model.model
+
+    @property
+    def vocabulary(self):
+        return self.loaded_model.vocabulary
+
+    @property
+    def use_fallback(self):
+        return self.loaded_model.model is None
+
+    def reload_model(self, background=True):
+        """Recharge le fichier modèle sans redémarrer (cf. ModelRegistry.reload)"""
+        if background:
+            return self.registry.reload_async(self.model_path)
+        return self.registry.reload(self.model_path)
+
+    def watch_model(self, interval=None):
+        """Active la surveillance du fichier modèle, dans chaque processus
+
+        Le thread démarre à la première prédiction du processus : avec gunicorn --preload,
+        chaque worker forké a ainsi le sien (un thread du processus maître n'est pas copié par fork).
+        """
+        self._watch_interval = interval or CREDIT_MODEL_WATCH or 5.0
+
+    def _start_watcher(self):
+        with self._watch_lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher = ModelWatcher(self.model_path, self.registry, self._watch_interval)
+            self._watcher.start()
+            self._watcher_pid = os.getpid()
+
+    def stop_watching(self):
+        self._watch_interval = None
+        if self._watcher is not None and self._watcher_pid == os.getpid():
+            self._watcher.stop()
+        self._watcher = self._watcher_pid = None
+
+    def model_status(self):
+        """Modèle en service, dernier rechargement et cache des prédictions"""
+        loaded = self.loaded_model
+        return {
+            'path': loaded.path,
+            'version': loaded.version,
+            'fallback': loaded.model is None,
+            'error': str(loaded.error) if loaded.error else None,
+            'vocabulary': loaded.vocabulary.version,
+            'last_reload': self.registry.reloads.get(os.path.abspath(self.model_path)),
+            'cache': self.cache_stats(),
+            'shadow': self.shadow.stats() if self.shadow is not None else None
+        }
+
+    def warm_up(self):
+        """Charge le modèle tout de suite (avant le fork des workers pour partager sa mémoire)"""
+        return self.model is not None
     
     def calculate_age(self, birth_date):
         """Calcule l'âge à partir de la date de naissance"""
@@ -105,25 +648,11 @@ class CreditPredictor:
     
     def encode_credit_type(self, credit_type):
         """Encode le type de crédit"""
-        credit_mapping = {
-            'Crédit consommation': 1,
-            'Crédit personnel': 1,
-            'Crédit auto': 2,
-            'Crédit immobilier': 3,
-            'Regroupement de crédits': 4
-        }
-        return credit_mapping.get(credit_type, 1)
+        return CREDIT_TYPE_CODES.get(credit_type, 1)
     
     def encode_contract_type(self, contract_type):
         """Encode le type de contrat"""
-        contract_mapping = {
-            'CDI': 1.0,
-            'CDD': 0.8,
-            'Indépendant / Freelance': 0.6,
-            'Retraité': 0.7,
-            'Autre': 0.5
-        }
-        return contract_mapping.get(contract_type, 0.5)
+        return CONTRACT_TYPE_WEIGHTS.get(contract_type, 0.5)
     
     def determine_score_group(self, risk_score):
         """Détermine le groupe de score basé sur le risk_score"""
@@ -140,110 +669,24 @@ class CreditPredictor:
             return {'score_group_Bon': False, 'score_group_Moyen': False, 
                    'score_group_Risque élevé': False, 'score_group_Très risqué': True}
     
-    def encode_categorical_features(self, form_data):
+    def encode_categorical_features(self, form_data, vocabulary=None):
         """Encode les variables catégorielles pour le modèle"""
-        
-        # Encodage du mois
-        month_mapping = {
-            'January': 1, 'February': 2, 'March': 3, 'April': 4, 'May': 5, 'June': 6,
-            'July': 7, 'August': 8, 'September': 9, 'October': 10, 'November': 11, 'December': 12
-        }
-        month = month_mapping.get(form_data.get('Month', 'January'), 1)
-        
-        # Encodage de l'occupation
-        occupation_mapping = {
-            'Engineer': 1, 'Teacher': 2, 'Doctor': 3, 'Lawyer': 4, 'Manager': 5,
-            'Accountant': 6, 'Developer': 7, 'Scientist': 8, 'Architect': 9,
-            'Consultant': 10, 'Other': 11
-        }
-        occupation = form_data.get('Occupation', 'Other')
-        occupation_encoded = occupation_mapping.get(occupation, 11)
-        
-        # Encodage du type de prêt
-        loan_type_mapping = {
-            'Auto Loan': 1, 'Credit-Builder Loan': 2, 'Personal Loan': 3,
-            'Home Equity Loan': 4, 'Mortgage Loan': 5, 'Student Loan': 6,
-            'Debt Consolidation Loan': 7, 'Payday Loan': 8, 'Not Specified': 9
-        }
-        loan_type = form_data.get('Type_of_Loan', 'Not Specified')
-        loan_type_encoded = loan_type_mapping.get(loan_type, 9)
-        
-        # Encodage du Credit Mix
-        credit_mix_mapping = {'Standard': 1, 'Good': 2, 'Bad': 3}
-        credit_mix = form_data.get('Credit_Mix', 'Standard')
-        credit_mix_encoded = credit_mix_mapping.get(credit_mix, 1)
-        
-        # Encodage du Payment of Min Amount
-        payment_min_mapping = {'Yes': 1, 'No': 0, 'NM': 2}
-        payment_min = form_data.get('Payment_of_Min_Amount', 'NM')
-        payment_min_encoded = payment_min_mapping.get(payment_min, 2)
-        
-        # Encodage du Payment Behaviour
-        payment_behaviour_mapping = {
-            'High_spent_Small_value_payments': 1,
-            'Low_spent_Large_value_payments': 2,
-            'High_spent_Medium_value_payments': 3,
-            'Low_spent_Medium_value_payments': 4,
-            'High_spent_Large_value_payments': 5,
-            'Low_spent_Small_value_payments': 6
-        }
-        payment_behaviour = form_data.get('Payment_Behaviour', 'Low_spent_Medium_value_payments')
-        payment_behaviour_encoded = payment_behaviour_mapping.get(payment_behaviour, 4)
-        
-        return {
-            'Month': month,
-            'Occupation': occupation_encoded,
-            'Type_of_Loan': loan_type_encoded,
-            'Credit_Mix': credit_mix_encoded,
-            'Payment_of_Min_Amount': payment_min_encoded,
-            'Payment_Behaviour': payment_behaviour_encoded
-        }
+        return (vocabulary or self.vocabulary).encode_form(form_data)
 
-    def prepare_features(self, form_data):
+    def prepare_features(self, form_data, vocabulary=None):
         """Prépare les features pour la prédiction à partir des données du formulaire"""
         try:
             # Encodage des variables catégorielles
-            encoded_features = self.encode_categorical_features(form_data)
-            
-            # Extraction et conversion des données numériques
-            def safe_float(value, default=0.0):
-                try:
-                    return float(value) if value else default
-                except (ValueError, TypeError):
-                    return default
-            
-            def safe_int(value, default=0):
-                try:
-                    return int(value) if value else default
-                except (ValueError, TypeError):
-                    return default
+            encoded_features = self.encode_categorical_features(form_data, vocabulary)
             
             # Création du DataFrame avec toutes les features attendues par le modèle
-            features_dict = {
-                'Month': encoded_features['Month'],
-                'Age': safe_int(form_data.get('Age'), 30),
-                'Occupation': encoded_features['Occupation'],
-                'Annual_Income': safe_float(form_data.get('Annual_Income'), 50000),
-                'Monthly_Inhand_Salary': safe_float(form_data.get('Monthly_Inhand_Salary'), 4000),
-                'Num_Bank_Accounts': safe_int(form_data.get('Num_Bank_Accounts'), 1),
-                'Num_Credit_Card': safe_int(form_data.get('Num_Credit_Card'), 0),
-                'Interest_Rate': safe_float(form_data.get('Interest_Rate'), 10.0),
-                'Num_of_Loan': safe_int(form_data.get('Num_of_Loan'), 0),
-                'Type_of_Loan': encoded_features['Type_of_Loan'],
-                'Delay_from_due_date': safe_int(form_data.get('Delay_from_due_date'), 0),
-                'Num_of_Delayed_Payment': safe_int(form_data.get('Num_of_Delayed_Payment'), 0),
-                'Changed_Credit_Limit': safe_float(form_data.get('Changed_Credit_Limit'), 0),
-                'Num_Credit_Inquiries': safe_int(form_data.get('Num_Credit_Inquiries'), 0),
-                'Credit_Mix': encoded_features['Credit_Mix'],
-                'Outstanding_Debt': safe_float(form_data.get('Outstanding_Debt'), 0),
-                'Credit_Utilization_Ratio': safe_float(form_data.get('Credit_Utilization_Ratio'), 25.0),
-                'Credit_History_Age': safe_float(form_data.get('Credit_History_Age'), 5.0),
-                'Payment_of_Min_Amount': encoded_features['Payment_of_Min_Amount'],
-                'Total_EMI_per_month': safe_float(form_data.get('Total_EMI_per_month'), 0),
-                'Amount_invested_monthly': safe_float(form_data.get('Amount_invested_monthly'), 0),
-                'Payment_Behaviour': encoded_features['Payment_Behaviour'],
-                'Monthly_Balance': safe_float(form_data.get('Monthly_Balance'), 1000)
-            }
+            features_dict = {}
+            for feature in EXPECTED_FEATURES:
+                if feature in encoded_features:
+                    features_dict[feature] = encoded_features[feature]
+                else:
+                    default, is_int = NUMERIC_DEFAULTS[feature]
+                    features_dict[feature] = (safe_int if is_int else safe_float)(form_data.get(feature), default)
             
             # Créer le DataFrame
             features = pd.DataFrame([features_dict])
@@ -258,6 +701,35 @@ class CreditPredictor:
             import traceback
             traceback.print_exc()
             return None
+
+    def encode_row(self, form_data, out, vocabulary=None):
+        """Encode une demande directement dans out (vecteur float64 dans l'ordre EXPECTED_FEATURES)"""
+        for j, feature, mapping, default, parse in (vocabulary or self.vocabulary).row_plan:
+            value = form_data.get(feature)
+            out[j] = mapping.get(value, default) if mapping is not None else parse(value, default)
+        return out
+
+    def _buffers(self):
+        """Tampons d'une ligne, alloués une fois par thread"""
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None:
+            buffers = self._local.buffers = (np.empty((1, len(EXPECTED_FEATURES)), dtype=np.float64),
+                                             np.empty((1, len(EXPECTED_FEATURES)), dtype=np.float32))
+        return buffers
+
+    def encode_batch(self, forms, vocabulary=None):
+        """Encode une liste de formulaires en une matrice float64 (une ligne par demande, colonnes EXPECTED_FEATURES)"""
+        vocabulary = vocabulary or self.vocabulary
+        X = np.empty((len(forms), len(EXPECTED_FEATURES)), dtype=np.float64)
+        for j, feature in enumerate(EXPECTED_FEATURES):
+            values = [form.get(feature) for form in forms]
+            if feature in vocabulary.mappings:
+                X[:, j] = vocabulary.transform(feature, values)
+            else:
+                default, is_int = NUMERIC_DEFAULTS[feature]
+                parse = safe_int if is_int else safe_float
+                X[:, j] = [parse(value, default) for value in values]
+        return X
     
     def calculate_credit_score_fallback(self, form_data):
         """Calcule un score de crédit basé sur des règles métier (mode de secours)"""
@@ -352,6 +824,79 @@ class CreditPredictor:
             print(f"❌ Erreur calcul score alternatif: {e}")
             return 650  # Score moyen par défaut
     
+    # Au-delà, les entiers ne sont plus exacts en float64 : la demande passe par le calcul ligne par ligne
+    FALLBACK_INT_LIMIT = 2 ** 40
+
+    def calculate_credit_scores_fallback(self, forms):
+        """Mêmes règles que calculate_credit_score_fallback pour N demandes, en opérations NumPy (sans affichage)"""
+        forms = list(forms)
+        n = len(forms)
+        columns = {name: np.zeros(n) for name in ('age', 'annual_income', 'credit_utilization', 'credit_history_age',
+                                                   'num_delayed_payments', 'outstanding_debt', 'num_credit_inquiries')}
+        payment_no = np.zeros(n, dtype=bool)
+        credit_mix_good = np.zeros(n, dtype=bool)
+        credit_mix_bad = np.zeros(n, dtype=bool)
+        valid = np.ones(n, dtype=bool)
+        scalar_rows = []
+
+        # Lecture des champs avec les mêmes conversions que le calcul ligne par ligne
+        for i, form_data in enumerate(forms):
+            try:
+                age = int(form_data.get('Age', 30))
+                float(form_data.get('Monthly_Inhand_Salary', 4000))  # lu (et validé) mais sans effet sur le score
+                num_delayed_payments = int(form_data.get('Num_of_Delayed_Payment', 0))
+                num_credit_inquiries = int(form_data.get('Num_Credit_Inquiries', 2))
+                values = (float(form_data.get('Annual_Income', 50000)), float(form_data.get('Credit_Utilization_Ratio', 30)),
+                          float(form_data.get('Credit_History_Age', 5)), float(form_data.get('Outstanding_Debt', 0)))
+            except Exception:
+                valid[i] = False
+                continue
+            if max(abs(age), abs(num_delayed_payments), abs(num_credit_inquiries)) > self.FALLBACK_INT_LIMIT:
+                scalar_rows.append(i)
+                continue
+            columns['age'][i] = age
+            columns['num_delayed_payments'][i] = num_delayed_payments
+            columns['num_credit_inquiries'][i] = num_credit_inquiries
+            (columns['annual_income'][i], columns['credit_utilization'][i],
+             columns['credit_history_age'][i], columns['outstanding_debt'][i]) = values
+            payment_no[i] = form_data.get('Payment_of_Min_Amount', 'Yes') == 'No'
+            credit_mix = form_data.get('Credit_Mix', 'Standard')
+            credit_mix_good[i] = credit_mix == 'Good'
+            credit_mix_bad[i] = credit_mix == 'Bad'
+
+        annual_income = columns['annual_income']
+        age = columns['age']
+        credit_utilization = columns['credit_utilization']
+        credit_history_age = columns['credit_history_age']
+
+        income_score = np.select([annual_income >= 100000, annual_income >= 75000, annual_income >= 50000,
+                                  annual_income >= 30000], [100, 80, 60, 40], 20)
+        age_score = np.select([(25 <= age) & (age <= 55), (18 <= age) & (age <= 65)], [50, 35], 20)
+        utilization_score = np.select([credit_utilization <= 10, credit_utilization <= 30, credit_utilization <= 50,
+                                       credit_utilization <= 70], [100, 80, 60, 40], 10)
+        history_score = np.select([credit_history_age >= 10, credit_history_age >= 5, credit_history_age >= 2],
+                                  [80, 60, 40], 20)
+
+        # Pénalités, additionnées dans le même ordre (les entiers sont exacts en float64)
+        debt_penalty = columns['outstanding_debt'] / 1000
+        debt_penalty = np.where(50 < debt_penalty, 50, debt_penalty)
+        penalty = (columns['num_delayed_payments'] * 15 + columns['num_credit_inquiries'] * 5) + debt_penalty
+        penalty = penalty + np.where(payment_no, 30, 0)
+        bonus = np.where(credit_mix_good, 20, 0)
+        penalty = penalty + np.where(credit_mix_bad, 20, 0)
+
+        base_score = 500
+        final_score = (base_score + income_score + age_score + utilization_score + history_score + bonus) - penalty
+
+        # int() échoue sur NaN / infini : score moyen par défaut, comme le calcul ligne par ligne
+        valid &= np.isfinite(final_score)
+        scores = np.full(n, 650, dtype=np.int64)
+        scores[valid] = np.clip(np.trunc(final_score[valid]), 300, 850)
+        for i in scalar_rows:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                scores[i] = self.calculate_credit_score_fallback(forms[i])
+        return scores
+
     def interpret_credit_score(self, credit_score):
         """Interprète le score de crédit prédit"""
         if credit_score >= 750:
@@ -390,46 +935,96 @@ class CreditPredictor:
                 'probability': 0.15
             }
 
+    def fallback_result(self, predicted_credit_score, form_data):
+        """Résultat du mode alternatif (règles métier)"""
+        # Interprétation du score
+        score_interpretation = self.interpret_credit_score(predicted_credit_score)
+        
+        # Message personnalisé
+        if score_interpretation['approved']:
+            message = f"✅ Crédit approuvé ! Score de crédit calculé: {predicted_credit_score:.0f} ({score_interpretation['category']}) - Mode alternatif"
+        else:
+            message = f"❌ Crédit refusé. Score de crédit calculé: {predicted_credit_score:.0f} ({score_interpretation['category']}) - Mode alternatif"
+        
+        # Détails pour l'analyse
+        details = {
+            'predicted_credit_score': predicted_credit_score,
+            'score_category': score_interpretation['category'],
+            'calculation_method': 'Règles métier (mode alternatif)',
+            'age': form_data.get('Age', 'N/A'),
+            'annual_income': form_data.get('Annual_Income', 'N/A'),
+            'credit_utilization': form_data.get('Credit_Utilization_Ratio', 'N/A'),
+            'credit_history_age': form_data.get('Credit_History_Age', 'N/A')
+        }
+        
+        return {
+            'approved': score_interpretation['approved'],
+            'credit_score': predicted_credit_score,
+            'probability': score_interpretation['probability'],
+            'risk_level': score_interpretation['risk_level'],
+            'message': message,
+            'details': details
+        }
+
+    def model_result(self, predicted_credit_score, features):
+        """Résultat du modèle ML ; features : valeurs encodées de la demande (indexées par nom de colonne)"""
+        # Interprétation du score
+        score_interpretation = self.interpret_credit_score(predicted_credit_score)
+        
+        # Message personnalisé
+        if score_interpretation['approved']:
+            message = f"✅ Crédit approuvé ! Score de crédit prédit: {predicted_credit_score:.0f} ({score_interpretation['category']})"
+        else:
+            message = f"❌ Crédit refusé. Score de crédit prédit: {predicted_credit_score:.0f} ({score_interpretation['category']})"
+        
+        # Détails pour l'analyse
+        details = {
+            'predicted_credit_score': predicted_credit_score,
+            'score_category': score_interpretation['category'],
+            'age': features['Age'],
+            'annual_income': features['Annual_Income'],
+            'monthly_salary': features['Monthly_Inhand_Salary'],
+            'num_bank_accounts': features['Num_Bank_Accounts'],
+            'num_credit_cards': features['Num_Credit_Card'],
+            'credit_utilization': features['Credit_Utilization_Ratio'],
+            'credit_history_age': features['Credit_History_Age'],
+            'num_loans': features['Num_of_Loan'],
+            'delayed_payments': features['Num_of_Delayed_Payment']
+        }
+        
+        return {
+            'approved': score_interpretation['approved'],
+            'credit_score': predicted_credit_score,
+            'probability': score_interpretation['probability'],
+            'risk_level': score_interpretation['risk_level'],
+            'message': message,
+            'details': details
+        }
+
+    def error_result(self, error):
+        return {
+            'approved': False,
+            'credit_score': 0,
+            'probability': 0.0,
+            'risk_level': 'Erreur',
+            'message': f'Erreur lors de l\'analyse: {str(error)}',
+            'details': {}
+        }
+
     def predict_credit_approval(self, form_data):
         """Prédit le score de crédit et l'approbation basée sur les données du formulaire"""
         
         # Utiliser le mode de secours si le modèle n'est pas disponible ou en cas d'erreur de compatibilité
-        if self.model is None or self.use_fallback:
+        # (le modèle est lu une fois : un rechargement en cours n'affecte pas cette prédiction)
+        loaded = self.loaded_model
+        model = loaded.model
+        if model is None:
             print("🔄 Utilisation du mode de prédiction alternatif")
-            predicted_credit_score = self.calculate_credit_score_fallback(form_data)
-            
-            # Interprétation du score
-            score_interpretation = self.interpret_credit_score(predicted_credit_score)
-            
-            # Message personnalisé
-            if score_interpretation['approved']:
-                message = f"✅ Crédit approuvé ! Score de crédit calculé: {predicted_credit_score:.0f} ({score_interpretation['category']}) - Mode alternatif"
-            else:
-                message = f"❌ Crédit refusé. Score de crédit calculé: {predicted_credit_score:.0f} ({score_interpretation['category']}) - Mode alternatif"
-            
-            # Détails pour l'analyse
-            details = {
-                'predicted_credit_score': predicted_credit_score,
-                'score_category': score_interpretation['category'],
-                'calculation_method': 'Règles métier (mode alternatif)',
-                'age': form_data.get('Age', 'N/A'),
-                'annual_income': form_data.get('Annual_Income', 'N/A'),
-                'credit_utilization': form_data.get('Credit_Utilization_Ratio', 'N/A'),
-                'credit_history_age': form_data.get('Credit_History_Age', 'N/A')
-            }
-            
-            return {
-                'approved': score_interpretation['approved'],
-                'credit_score': predicted_credit_score,
-                'probability': score_interpretation['probability'],
-                'risk_level': score_interpretation['risk_level'],
-                'message': message,
-                'details': details
-            }
+            return self.fallback_result(self.calculate_credit_score_fallback(form_data), form_data)
         
         try:
             # Préparer les features pour le modèle ML
-            features = self.prepare_features(form_data)
+            features = self.prepare_features(form_data, loaded.vocabulary)
             if features is None:
                 # Fallback en cas d'erreur de préparation
                 print("⚠️ Erreur préparation features, utilisation du mode alternatif")
@@ -445,53 +1040,83 @@ class CreditPredictor:
                 }
             
             # Prédiction du Credit Score avec le modèle ML
-            predicted_credit_score = self.model.predict(features)[0]
-            
-            # Interprétation du score
-            score_interpretation = self.interpret_credit_score(predicted_credit_score)
-            
-            # Message personnalisé
-            if score_interpretation['approved']:
-                message = f"✅ Crédit approuvé ! Score de crédit prédit: {predicted_credit_score:.0f} ({score_interpretation['category']})"
-            else:
-                message = f"❌ Crédit refusé. Score de crédit prédit: {predicted_credit_score:.0f} ({score_interpretation['category']})"
-            
-            # Détails pour l'analyse
-            details = {
-                'predicted_credit_score': predicted_credit_score,
-                'score_category': score_interpretation['category'],
-                'age': features['Age'].iloc[0],
-                'annual_income': features['Annual_Income'].iloc[0],
-                'monthly_salary': features['Monthly_Inhand_Salary'].iloc[0],
-                'num_bank_accounts': features['Num_Bank_Accounts'].iloc[0],
-                'num_credit_cards': features['Num_Credit_Card'].iloc[0],
-                'credit_utilization': features['Credit_Utilization_Ratio'].iloc[0],
-                'credit_history_age': features['Credit_History_Age'].iloc[0],
-                'num_loans': features['Num_of_Loan'].iloc[0],
-                'delayed_payments': features['Num_of_Delayed_Payment'].iloc[0]
-            }
-            
-            return {
-                'approved': score_interpretation['approved'],
-                'credit_score': predicted_credit_score,
-                'probability': score_interpretation['probability'],
-                'risk_level': score_interpretation['risk_level'],
-                'message': message,
-                'details': details
-            }
+            predicted_credit_score = model.predict(features)[0]
+            return self.model_result(predicted_credit_score, features.iloc[0])
             
         except Exception as e:
             print(f"❌ Erreur lors de la prédiction: {e}")
             import traceback
             traceback.print_exc()
-            return {
-                'approved': False,
-                'credit_score': 0,
-                'probability': 0.0,
-                'risk_level': 'Erreur',
-                'message': f'Erreur lors de l\'analyse: {str(e)}',
-                'details': {}
-            }
+            return self.error_result(e)
+
+    def predict_fast(self, form_data):
+        """Prédiction d'une demande interactive : tampon préalloué, sans DataFrame ni affichage"""
+        loaded = self.loaded_model
+        if loaded.model is None:
+            return self.fallback_result(int(self.calculate_credit_scores_fallback([form_data])[0]), form_data)
+
+        row, row32 = self._buffers()
+        try:
+            self.encode_row(form_data, row[0], loaded.vocabulary)
+            key = self.cache_key(row, loaded.version)
+            cached = self.prediction_cache.get(key)
+            if cached is not None:
+                result, seconds = cached
+                with self._saved_lock:
+                    self._saved_seconds += seconds
+                return {**result, 'details': dict(result['details'])}
+
+            start = time.perf_counter()
+            predicted_credit_score = loaded.predict_row(row, row32)
+            inference_seconds = time.perf_counter() - start
+            result = self.model_result(predicted_credit_score, RowView(row[0]))
+        except Exception as e:
+            print(f"❌ Erreur lors de la prédiction: {e}")
+            return self.error_result(e)
+
+        self.prediction_cache.set(key, (result, time.perf_counter() - start))
+        if self.shadow is not None:
+            self.shadow.submit(row.copy(), predicted_credit_score, inference_seconds, loaded.version)
+        return {**result, 'details': dict(result['details'])}
+
+    @staticmethod
+    def cache_key(row, version):
+        """Empreinte canonique d'une ligne encodée (-0.0 ramené à 0.0) et de la version du modèle"""
+        canonical = np.add(row, 0.0)
+        return version, hashlib.blake2b(canonical.tobytes(), digest_size=16).hexdigest()
+
+    def cache_stats(self):
+        """Taux de succès du cache des prédictions et temps de calcul évité"""
+        stats = self.prediction_cache.stats()
+        with self._saved_lock:
+            stats['seconds_saved'] = self._saved_seconds
+        stats['ms_saved_per_hit'] = stats['seconds_saved'] * 1000 / stats['hits'] if stats['hits'] else 0.0
+        return stats
+
+    def predict_batch(self, forms):
+        """Score de plusieurs demandes : encodage en une matrice et un seul appel au modèle"""
+        forms = list(forms)
+        if not forms:
+            return []
+
+        loaded = self.loaded_model
+        model = loaded.model
+        if model is None:
+            print(f"🔄 Mode de prédiction alternatif pour {len(forms)} demandes")
+            scores = self.calculate_credit_scores_fallback(forms)
+            return [self.fallback_result(int(score), form) for score, form in zip(scores, forms)]
+
+        try:
+            X = self.encode_batch(forms, loaded.vocabulary)
+            scores = model.predict(pd.DataFrame(X, columns=EXPECTED_FEATURES))
+        except Exception as e:
+            print(f"❌ Erreur lors de la prédiction par lot: {e}")
+            import traceback
+            traceback.print_exc()
+            return [self.error_result(e) for _ in forms]
+
+        print(f"✅ {len(forms)} demandes scorées en un appel au modèle")
+        return [self.model_result(score, dict(zip(EXPECTED_FEATURES, row))) for score, row in zip(scores, X)]
 
 # Instance globale du prédicteur
 credit_predictor = CreditPredictor()
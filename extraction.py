@@ -1,10 +1,105 @@
-import easyocr
+import os
 import re
+import hashlib
+import queue
+import threading
+from contextlib import contextmanager
+import cv2
 import arabic_reshaper
 from bidi.algorithm import get_display
+from card_preprocessing import field_boxes, preprocess_card
+from ocr_backends import OCR_BACKEND, backend_available, create_backend
+from ttl_cache import TTLCache
 
-# Initialisation du lecteur OCR
-reader = easyocr.Reader(['ar', 'en'])
+# Configuration du pool de lecteurs OCR
+OCR_LANGUAGES = ['ar', 'en']
+OCR_POOL_SIZE = int(os.environ.get("OCR_POOL_SIZE", "2"))
+OCR_TIMEOUT = float(os.environ.get("OCR_TIMEOUT", "60"))  # secondes d'attente d'un lecteur libre
+
+# Prétraitement de la photo avant l'OCR (détection et redressement de la carte, binarisation optionnelle)
+OCR_PREPROCESS = os.environ.get("OCR_PREPROCESS", "1") != "0"
+OCR_BINARIZE = os.environ.get("OCR_BINARIZE", "0") == "1"
+OCR_MODE = os.environ.get("OCR_MODE", "regions")  # "regions" : zones du gabarit CIN, "page" : carte entière
+OCR_VERBOSE = os.environ.get("OCR_VERBOSE", "1") != "0"  # affichage des lignes lues (débogage)
+
+# Cache des résultats par empreinte SHA-256 de l'image : un même upload n'est lu qu'une fois
+OCR_RESULT_CACHE_SIZE = int(os.environ.get("OCR_RESULT_CACHE_SIZE", "256"))
+OCR_RESULT_CACHE_TTL = int(os.environ.get("OCR_RESULT_CACHE_TTL", "3600"))  # secondes
+resultats_ocr = TTLCache(maxsize=OCR_RESULT_CACHE_SIZE, ttl=OCR_RESULT_CACHE_TTL)
+
+# Caractères autorisés par zone
+DIGITS = "0123456789"
+ARABIC_LETTERS = "".join(chr(c) for c in range(0x0621, 0x064B)) + " "
+
+class OCRBusyError(RuntimeError):
+    """Aucun lecteur OCR libre avant la fin du délai d'attente"""
+
+# Pool de lecteurs OCR (moteur OCR_BACKEND) : créés à la première utilisation, puis réutilisés
+# Le moteur OCR n'est importé qu'à la création du premier lecteur (démarrage de l'application plus rapide)
+class ReaderPool:
+    def __init__(self, size=OCR_POOL_SIZE, languages=OCR_LANGUAGES, timeout=OCR_TIMEOUT, backend=OCR_BACKEND):
+        if not backend_available(backend):
+            raise ImportError(f"OCR backend '{backend}' is not installed")
+        self.size = max(1, size)
+        self.backend = backend
+        self.languages = languages
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()  # le dernier lecteur rendu (déjà chaud) est réutilisé en premier
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _create_reader(self):
+        print(f"⏳ Chargement d'un lecteur {self.backend} {self.languages} ({self._created}/{self.size})")
+        return create_backend(self.backend, self.languages)
+
+    def acquire(self, timeout=None):
+        """Prend un lecteur libre, en crée un si la limite n'est pas atteinte, sinon attend"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return self._create_reader()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise OCRBusyError(f"Aucun lecteur OCR disponible après {timeout:g}s")
+
+    def release(self, reader):
+        self._idle.put(reader)
+
+    @contextmanager
+    def reader(self, timeout=None):
+        reader = self.acquire(timeout)
+        try:
+            yield reader
+        finally:
+            self.release(reader)
+
+    def warm_up(self, count=1):
+        """Crée à l'avance jusqu'à count lecteurs (optionnel, au démarrage d'un worker)"""
+        readers = [self.acquire() for _ in range(min(count, self.size))]
+        for reader in readers:
+            self.release(reader)
+
+# Pool par défaut, seulement si le moteur configuré est installé (les benchmarks, le traitement
+# par lot et les tests installent leur propre pool avec le moteur de leur choix)
+reader_pool = ReaderPool() if backend_available(OCR_BACKEND) else None
+
+def ocr_available():
+    return reader_pool is not None
 
 # Mois arabes pour formater la date
 mois_arabe = {
@@ -33,16 +128,87 @@ def formater_date(date_text):
         return f"{jour}/{mois}/{annee}"
     return date_text
 
-# Fonction principale d'extraction
-def extraire_donnees(image_path):
-    # Lecture OCR
-    results = reader.readtext(image_path, detail=0, paragraph=True)
+# Lecture des seules zones du gabarit (carte redressée) : pas de détection de texte
+def lire_regions(reader, card):
+    gray = card if card.ndim == 2 else cv2.cvtColor(card, cv2.COLOR_BGR2GRAY)
+    boxes = field_boxes(gray)
+
+    def lire(fields, allowlist):
+        return reader.recognize(gray, [boxes[f] for f in fields], allowlist)
+
+    # Un CIN illisible signifie que la carte ne correspond pas au gabarit (mauvais cadrage, carte à l'envers)
+    cin = "".join(lire(['cin'], DIGITS)).replace(" ", "")
+    if not re.fullmatch(r"\d{8}", cin):
+        return None
+
+    nom, prenom = (re.sub(r"(اللقب|اللفب|الاسم|الاسـم)", "", text).strip()
+                   for text in lire(['nom', 'prenom'], ARABIC_LETTERS))
+    date_match = re.search(r"\d{1,2}\s+[\u0600-\u06FF]+\s+(19|20)\d{2}",
+                           " ".join(lire(['date_naissance'], ARABIC_LETTERS + DIGITS)))
+    if not nom or not prenom or not date_match:
+        return None
+
+    if OCR_VERBOSE:
+        print(f"🔍 OCR zones: {cin} | {nom} | {prenom} | {date_match.group()}")
+    return cin, fix_arabic(nom), fix_arabic(prenom), formater_date(date_match.group())
+
+# Empreinte SHA-256 du contenu d'un fichier
+def empreinte_fichier(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# Fonction principale d'extraction (résultat mis en cache par contenu d'image et réglages OCR)
+def extraire_donnees(image_path, preprocess=OCR_PREPROCESS, binarize=OCR_BINARIZE, mode=OCR_MODE):
+    if reader_pool is None:
+        raise ImportError(f"OCR backend '{OCR_BACKEND}' is not installed")
+    if not isinstance(image_path, str):
+        return _extraire_donnees(image_path, preprocess, binarize, mode)
+
+    cle = (empreinte_fichier(image_path), reader_pool.backend, preprocess, binarize, mode)
+    resultat = resultats_ocr.get(cle)
+    if resultat is None:
+        try:
+            resultat = _extraire_donnees(image_path, preprocess, binarize, mode)
+        except ValueError as e:
+            resultat = str(e)  # carte refusée : le même fichier sera refusé sans relancer l'OCR
+        resultats_ocr.set(cle, resultat)
+    elif OCR_VERBOSE:
+        print(f"♻️ Résultat OCR déjà connu pour l'image {cle[0][:12]}")
+
+    if isinstance(resultat, str):
+        raise ValueError(resultat)
+    return resultat
+
+def _extraire_donnees(image_path, preprocess, binarize, mode):
+    # Carte redressée à la résolution de travail : moins de pixels pour l'OCR
+    image, aligned = image_path, False
+    if preprocess:
+        image, aligned = preprocess_card(image_path, binarize_output=binarize)
+        if not aligned:
+            print("⚠️ Contour de la carte non détecté, photo entière réduite")
+
+    with reader_pool.reader() as reader:
+        # Mode gabarit : seules les zones des champs sont reconnues
+        if mode == "regions" and aligned:
+            champs = lire_regions(reader, image)
+            if champs is not None:
+                return champs
+            print("⚠️ Gabarit CIN non reconnu, lecture de la carte entière")
+
+        # Lecture OCR
+        if not isinstance(image, str) and image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)  # les moteurs OCR attendent du RGB
+        results = reader.readtext(image)
     full_text = " ".join(results)
 
     # 🔍 Affichage pour débogage
-    print("🔍 OCR lines:")
-    for line in results:
-        print("•", line)
+    if OCR_VERBOSE:
+        print("🔍 OCR lines:")
+        for line in results:
+            print("•", line)
 
     # Vérification par numéro CIN
     cin_match = re.search(r"\b\d{8}\b", full_text)
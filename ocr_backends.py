@@ -0,0 +1,82 @@
+"""
+Moteurs OCR interchangeables pour l'extraction des CIN (choix par OCR_BACKEND)
+
+Chaque moteur expose deux opérations :
+- readtext(image) : blocs de texte de l'image entière (détection + reconnaissance)
+- recognize(gray, boxes, allowlist) : un texte par zone [x_min, x_max, y_min, y_max], sans détection
+"""
+
+import os
+import shutil
+import importlib.util
+from abc import ABC, abstractmethod
+
+OCR_BACKEND = os.environ.get("OCR_BACKEND", "easyocr")
+OCR_GPU = os.environ.get("OCR_GPU", "0") == "1"
+
+class OCRBackend(ABC):
+    """Un moteur incomplet échoue dès sa création, pas au milieu d'un job OCR"""
+    name = None
+
+    @abstractmethod
+    def readtext(self, image):
+        """Blocs de texte de l'image entière"""
+
+    @abstractmethod
+    def recognize(self, gray, boxes, allowlist=None):
+        """Un texte par zone [x_min, x_max, y_min, y_max]"""
+
+# 🧠 EasyOCR : détecteur CRAFT + reconnaissance, quantifié dynamiquement sur CPU
+class EasyOCRBackend(OCRBackend):
+    name = "easyocr"
+
+    def __init__(self, languages=('ar', 'en'), gpu=OCR_GPU):
+        import easyocr
+        self.reader = easyocr.Reader(list(languages), gpu=gpu, quantize=True)
+
+    @staticmethod
+    def available():
+        return importlib.util.find_spec("easyocr") is not None
+
+    def readtext(self, image):
+        return self.reader.readtext(image, detail=0, paragraph=True)
+
+    def recognize(self, gray, boxes, allowlist=None):
+        return self.reader.recognize(gray, horizontal_list=boxes, free_list=[], allowlist=allowlist, detail=0)
+
+# ⚡ Tesseract (LSTM, données 'ara') : pas de réseau de détection, rapide sur CPU
+class TesseractBackend(OCRBackend):
+    name = "tesseract"
+    LANGUAGE_CODES = {'ar': 'ara', 'en': 'eng', 'fr': 'fra'}
+
+    def __init__(self, languages=('ar', 'en')):
+        import pytesseract
+        self.pytesseract = pytesseract
+        self.lang = "+".join(self.LANGUAGE_CODES.get(code, code) for code in languages)
+
+    @staticmethod
+    def available():
+        return importlib.util.find_spec("pytesseract") is not None and shutil.which("tesseract") is not None
+
+    def readtext(self, image):
+        # psm 4 : une colonne de lignes de tailles variables, comme le recto de la CIN
+        text = self.pytesseract.image_to_string(image, lang=self.lang, config="--psm 4")
+        return [line.strip() for line in text.splitlines() if line.strip()]
+
+    def recognize(self, gray, boxes, allowlist=None):
+        # psm 7 : la zone contient une seule ligne de texte
+        config = "--psm 7"
+        if allowlist:
+            config += f" -c tessedit_char_whitelist={allowlist.replace(' ', '')} -c preserve_interword_spaces=1"
+        return [self.pytesseract.image_to_string(gray[y0:y1, x0:x1], lang=self.lang, config=config).strip()
+                for x0, x1, y0, y1 in boxes]
+
+BACKENDS = {backend.name: backend for backend in (EasyOCRBackend, TesseractBackend)}
+
+def backend_available(name=OCR_BACKEND):
+    return name in BACKENDS and BACKENDS[name].available()
+
+def create_backend(name=OCR_BACKEND, languages=('ar', 'en')):
+    if name not in BACKENDS:
+        raise ValueError(f"Moteur OCR inconnu : {name} (disponibles : {', '.join(BACKENDS)})")
+    return BACKENDS[name](languages)
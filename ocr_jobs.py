@@ -0,0 +1,146 @@
+"""
+File d'attente des traitements OCR : les uploads de CIN sont traités en arrière-plan,
+le navigateur interroge ensuite le statut du job
+
+L'état de chaque job est aussi écrit dans un fichier JSON (OCR_JOB_DIR) : avec plusieurs workers
+gunicorn, l'interrogation du statut peut arriver sur un autre worker que celui qui traite le job.
+"""
+
+import os
+import json
+import time
+import tempfile
+import uuid
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from ttl_cache import TTLCache
+
+# Configuration
+OCR_WORKERS = int(os.environ.get("OCR_WORKERS", os.environ.get("OCR_POOL_SIZE", "2")))
+OCR_QUEUE_SIZE = int(os.environ.get("OCR_QUEUE_SIZE", "50"))  # jobs en attente ou en cours au maximum
+OCR_JOB_TTL = int(os.environ.get("OCR_JOB_TTL", "900"))       # secondes de conservation d'un job
+OCR_JOB_DIR = os.environ.get("OCR_JOB_DIR", os.path.join(tempfile.gettempdir(), "ocr_jobs"))  # partagé entre workers
+
+class QueueFullError(RuntimeError):
+    """Trop de jobs OCR en attente"""
+
+class OCRJobQueue:
+    """Pool local de workers : submit() rend la main tout de suite avec un identifiant de job"""
+
+    def __init__(self, workers=OCR_WORKERS, max_pending=OCR_QUEUE_SIZE, ttl=OCR_JOB_TTL, store_dir=OCR_JOB_DIR):
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.store_dir = store_dir  # None : état gardé dans ce processus uniquement
+        if store_dir:
+            os.makedirs(store_dir, exist_ok=True)
+        self._submitted = 0
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="ocr-job")
+        self._jobs = TTLCache(maxsize=max(1000, 10 * max_pending), ttl=ttl)
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, owner=None, **kwargs):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFullError(f"{self._pending} jobs OCR déjà en attente")
+            self._pending += 1
+            self._submitted += 1
+            purge = self._submitted % 100 == 0
+
+        job_id = uuid.uuid4().hex
+        job = {'status': 'pending', 'owner': owner, 'result': None, 'error': None,
+               'created': time.time(), 'started': None, 'finished': None}
+        self._jobs.set(job_id, job)
+        self._save(job_id, job)
+        if purge:
+            self._purge_expired()
+        try:
+            self._executor.submit(self._run, job_id, job, fn, args, kwargs)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        return job_id
+
+    def _run(self, job_id, job, fn, args, kwargs):
+        job['status'], job['started'] = 'running', time.time()
+        self._save(job_id, job)
+        try:
+            job['result'] = fn(*args, **kwargs)
+            job['status'] = 'done'
+        except Exception as e:
+            print(f"❌ Job OCR {job_id} en échec : {e}")
+            traceback.print_exc()
+            job['error'] = str(e)
+            job['status'] = 'failed'
+        finally:
+            job['finished'] = time.time()
+            self._jobs.set(job_id, job)  # la durée de conservation part de la fin du traitement
+            self._save(job_id, job)
+            with self._lock:
+                self._pending -= 1
+
+    def status(self, job_id, owner=None):
+        """Copie de l'état du job, None s'il est inconnu, expiré ou appartient à un autre utilisateur"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            job = self._load(job_id)  # job d'un autre worker
+        if job is None or (owner is not None and job['owner'] != owner):
+            return None
+        return dict(job)
+
+    # 💾 État partagé : un fichier JSON par job, remplacé d'un bloc à chaque changement
+    def _path(self, job_id):
+        return os.path.join(self.store_dir, f"{job_id}.json")
+
+    def _save(self, job_id, job):
+        if not self.store_dir:
+            return
+        try:
+            tmp_path = f"{self._path(job_id)}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(job, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, self._path(job_id))
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️ État du job OCR {job_id} non partagé : {e}")
+
+    def _load(self, job_id):
+        if not self.store_dir or not all(c in "0123456789abcdef" for c in job_id):
+            return None
+        try:
+            with open(self._path(job_id), encoding='utf-8') as f:
+                job = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self._expired(job):
+            return None
+        return job
+
+    def _expired(self, job):
+        if self.ttl is None:
+            return False
+        # Un job resté « en cours » au-delà de la durée de conservation (worker arrêté) est oublié aussi
+        return time.time() - (job.get('finished') or job['created']) > self.ttl
+
+    def _purge_expired(self):
+        for name in os.listdir(self.store_dir):
+            path = os.path.join(self.store_dir, name)
+            try:
+                if name.endswith('.tmp'):
+                    expired = self.ttl is not None and time.time() - os.path.getmtime(path) > self.ttl
+                else:
+                    with open(path, encoding='utf-8') as f:
+                        expired = self._expired(json.load(f))
+                if expired:
+                    os.remove(path)
+            except (OSError, ValueError):
+                continue
+
+    def pending(self):
+        with self._lock:
+            return self._pending
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
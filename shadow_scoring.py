@@ -0,0 +1,159 @@
+"""
+Scoring fantôme (champion / challenger) : un second modèle, par exemple le XGBoost des notebooks,
+score les mêmes demandes en arrière-plan sans jamais influencer la décision
+
+Chaque comparaison est ajoutée à un fichier JSONL local (une ligne par demande) :
+scores des deux modèles, écart, décisions et temps d'inférence de chacun.
+
+    CREDIT_SHADOW_MODEL=xgboost_model.pkl python app.py
+    python shadow_scoring.py shadow_scores.jsonl     # résumé de la comparaison
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import threading
+from datetime import datetime
+
+import numpy as np
+
+# Configuration
+CREDIT_SHADOW_MODEL = os.environ.get("CREDIT_SHADOW_MODEL", "")  # modèle challenger (joblib), vide = désactivé
+CREDIT_SHADOW_LOG = os.environ.get("CREDIT_SHADOW_LOG", "shadow_scores.jsonl")
+CREDIT_SHADOW_QUEUE = int(os.environ.get("CREDIT_SHADOW_QUEUE", "1000"))  # demandes en attente au maximum
+
+class ShadowScorer:
+    """Un thread d'arrière-plan score chaque ligne encodée avec le challenger et enregistre la comparaison
+
+    submit() ne bloque jamais : si la file est pleine, la comparaison est abandonnée (compteur dropped).
+    Le thread démarre à la première soumission de chaque processus : un worker forké après l'import
+    (gunicorn --preload) n'hérite pas du thread du maître et doit avoir sa propre file.
+    """
+
+    def __init__(self, model_path, registry, store_path=CREDIT_SHADOW_LOG, max_pending=CREDIT_SHADOW_QUEUE,
+                 approve=None):
+        self.model_path = model_path
+        self.registry = registry
+        self.store_path = store_path
+        self.approve = approve  # score → décision (True = crédit approuvé)
+        self.recorded = 0
+        self.dropped = 0
+        self.failed = 0
+        self.max_pending = max_pending
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.max_pending)
+            self._thread = threading.Thread(target=self._run, args=(self._queue,), daemon=True,
+                                            name="credit-shadow")
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def submit(self, row, champion_score, champion_seconds, champion_version):
+        """row : copie de la ligne encodée (1, n) float64 ; le tampon du prédicteur est réutilisé"""
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self._queue.put_nowait((row, champion_score, champion_seconds, champion_version))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _run(self, pending):
+        row32 = None
+        with open(self.store_path, 'a', encoding='utf-8') as store:
+            while True:
+                item = pending.get()
+                if item is None:
+                    pending.task_done()
+                    return
+                row, champion_score, champion_seconds, champion_version = item
+                try:
+                    challenger = self.registry.get(self.model_path)
+                    if challenger.model is None:
+                        raise RuntimeError(f"challenger {self.model_path} indisponible: {challenger.error}")
+                    if row32 is None or row32.shape != row.shape:
+                        row32 = np.empty(row.shape, dtype=np.float32)
+
+                    start = time.perf_counter()
+                    challenger_score = float(challenger.predict_row(row, row32))
+                    challenger_seconds = time.perf_counter() - start
+
+                    record = {
+                        'at': datetime.now().isoformat(timespec='milliseconds'),
+                        'champion_version': champion_version,
+                        'challenger_version': challenger.version,
+                        'champion_score': float(champion_score),
+                        'challenger_score': challenger_score,
+                        'disagreement': abs(challenger_score - float(champion_score)),
+                        'champion_ms': round(champion_seconds * 1000, 4),
+                        'challenger_ms': round(challenger_seconds * 1000, 4),
+                    }
+                    if self.approve is not None:
+                        record['champion_approved'] = bool(self.approve(champion_score))
+                        record['challenger_approved'] = bool(self.approve(challenger_score))
+                    store.write(json.dumps(record) + '\n')
+                    store.flush()
+                    with self._lock:
+                        self.recorded += 1
+                except Exception as e:
+                    with self._lock:
+                        self.failed += 1
+                        if self.failed == 1 or self.failed % 100 == 0:
+                            print(f"⚠️ Scoring fantôme en échec ({self.failed}): {e}")
+                finally:
+                    pending.task_done()
+
+    def join(self):
+        """Attend que les demandes soumises soient enregistrées"""
+        if self._pid == os.getpid():
+            self._queue.join()
+
+    def close(self):
+        if self._pid == os.getpid():
+            self._queue.put(None)
+            self._thread.join()
+        self._queue = self._thread = self._pid = None
+
+    def stats(self):
+        with self._lock:
+            return {'model_path': self.model_path, 'store_path': self.store_path, 'recorded': self.recorded,
+                    'dropped': self.dropped, 'failed': self.failed,
+                    'pending': self._queue.qsize() if self._pid == os.getpid() else 0}
+
+# 📊 Résumé de la comparaison enregistrée
+def summarize(store_path=CREDIT_SHADOW_LOG):
+    records = []
+    with open(store_path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # dernière ligne tronquée
+    if not records:
+        return {'count': 0}
+
+    disagreement = np.array([r['disagreement'] for r in records])
+    summary = {'count': len(records), 'mean_disagreement': float(disagreement.mean()),
+               'p99_disagreement': float(np.percentile(disagreement, 99))}
+    for model in ('champion', 'challenger'):
+        p50, p99 = np.percentile([r[f'{model}_ms'] for r in records], [50, 99])
+        summary[f'{model}_p50_ms'], summary[f'{model}_p99_ms'] = float(p50), float(p99)
+    decisions = [r for r in records if 'champion_approved' in r]
+    if decisions:
+        flips = sum(r['champion_approved'] != r['challenger_approved'] for r in decisions)
+        summary['decision_flip_rate'] = flips / len(decisions)
+    return summary
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else CREDIT_SHADOW_LOG
+    for key, value in summarize(path).items():
+        print(f"   {key}: {value:.4f}" if isinstance(value, float) else f"   {key}: {value}")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la présélection des candidats AML (WatchlistIndex) : aucun match ne doit être perdu
+"""
+
+import random
+
+from AML import WatchlistIndex, is_similar_processed, match_processed, preprocess, similarity_details
+from bench_aml import brute_force_matches, synthetic_names, synthetic_queries
+
+def _assert_full_recall(names, queries):
+    index = WatchlistIndex(names)
+    for query in queries:
+        expected = set(brute_force_matches(query, names))
+        candidates = set(index.candidates(query).tolist())
+        assert expected <= candidates, f"Matches perdus pour '{query}': {expected - candidates}"
+
+def test_recall_on_synthetic_list():
+    names = [preprocess(n) for n in synthetic_names(800)]
+    queries = [preprocess(q) for q in synthetic_queries(30)]
+    _assert_full_recall(names, queries)
+
+def test_recall_on_edge_cases():
+    names = [preprocess(n) for n in ["Ali", "Al", "Oumeyma Sokkeh", "Sokkeh Oumeyma", "John Smith",
+                                     "مُحَمَّد", "émile zola", "محمد الطرابلسي", "x", "123 456",
+                                     "Jean-Pierre Dupont", "ben ali ahmed"]]
+    queries = [preprocess(q) for q in ["", "a", "ali", "sokkeh oumeyma", "oumeyma sokeh", "smith john",
+                                       "محمد", "émile zola", "emile zola", "123", "dupont jean-pierre",
+                                       "ahmed ben ali", "zzzzzzzzzzzz qqqqqqqq"]]
+    _assert_full_recall(names, queries)
+
+def test_recall_on_random_strings():
+    rng = random.Random(0)
+    alphabet = "abcdeilmnorst  " + "́" + "بتم"
+    def rand_name():
+        return "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 14))).strip()
+    names = [preprocess(rand_name()) for _ in range(400)]
+    queries = [preprocess(rand_name()) for _ in range(40)]
+    _assert_full_recall(names, queries)
+
+def test_tiered_scoring_same_decisions():
+    names = [preprocess(n) for n in synthetic_names(500) + ["mhmd", "mohamed", "Mohamed Trabelsi", "omar"]]
+    queries = [preprocess(q) for q in synthetic_queries(20) + ["مُحَمَّد", "عُمَر", "أَحْمَد بْن عَلِي"]]
+    assert similarity_details(preprocess("مُحَمَّد"), "mhmd")['match']
+    assert is_similar_processed(preprocess("مُحَمَّد"), "mhmd")
+    index = WatchlistIndex(names)
+    for query in queries:
+        expected = [similarity_details(query, name)['match'] for name in names]
+        assert [is_similar_processed(query, name) for name in names] == expected, query
+        assert match_processed(query, names, index)[0] == [i for i, match in enumerate(expected) if match], query
+
+if __name__ == "__main__":
+    test_recall_on_synthetic_list()
+    test_recall_on_edge_cases()
+    test_recall_on_random_strings()
+    test_tiered_scoring_same_decisions()
+    print("🏁 Tests terminés")
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la base AML chargée en mémoire (WatchlistStore)
+"""
+
+import os
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+
+from AML import WatchlistIndex, WatchlistRegistry, WatchlistStore, export_watchlist, is_similar
+
+WATCHLIST = pd.DataFrame({
+    "Full Name": ["Oumeyma Sokkeh", "John Smith", "Ahmed Ben Ali", "", "Mohamed Trabelsi",
+                  "Sarah Johnson", "محمد الطرابلسي", "Ali Hassan"],
+    "Risk Category": ["High", "Low", "High", "Low", "Medium", "Low", "High", "Medium"],
+})
+
+TEST_NAMES = ["sokkeh oumeyma", "John Smyth", "Ali Hassan", "Mohamed Trabelsi", "Zoe Xu"]
+
+def _write_watchlist(df, directory):
+    path = os.path.join(directory, "AML-augmented.xlsx")
+    df.to_excel(path, index=False)
+    return path
+
+def _brute_force(df, input_name):
+    """Ancienne implémentation : comparaison ligne par ligne"""
+    matches = []
+    for _, row in df.iterrows():
+        full_name = str(row.get("Full Name", "")).strip()
+        if full_name and is_similar(input_name, full_name):
+            matches.append(row)
+    return pd.DataFrame(matches)
+
+def test_same_matches_as_brute_force():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _write_watchlist(WATCHLIST, tmp)
+        store = WatchlistStore(path)
+        df = pd.read_excel(path)
+        for name in TEST_NAMES:
+            expected = _brute_force(df, name)
+            result = store.check_name(name)
+            print(f"🔍 '{name}' → {len(result)} match(s)")
+            assert result.empty == expected.empty
+            if not expected.empty:
+                assert result.index.tolist() == expected.index.tolist()
+                assert result["Full Name"].tolist() == expected["Full Name"].tolist()
+
+def test_vocalized_arabic_name_matches():
+    """Nom arabe vocalisé : les voyelles restent accrochées aux lettres latines après translittération"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _write_watchlist(pd.DataFrame({"Full Name": ["mhmd", "Zoe Xu"], "Risk Category": ["High", "Low"]}), tmp)
+        result = WatchlistStore(path).check_name("مُحَمَّد")
+        assert result["Full Name"].tolist() == ["mhmd"]
+
+def test_loaded_once_and_reloaded_on_change():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _write_watchlist(WATCHLIST, tmp)
+        store = WatchlistStore(path)
+        first = store.refresh()
+        assert store.refresh() is first  # pas de relecture si le fichier est inchangé
+
+        updated = pd.concat([WATCHLIST, pd.DataFrame({"Full Name": ["Zoe Xu"], "Risk Category": ["High"]})])
+        _write_watchlist(updated, tmp)
+        os.utime(path, (first.mtime + 10, first.mtime + 10))
+
+        second = store.refresh()
+        assert second is not first
+        assert len(second) == len(first) + 1
+        assert not store.check_name("Zoe Xu").empty
+
+def test_missing_name_column():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _write_watchlist(pd.DataFrame({"Name": ["John Smith"]}), tmp)
+        assert WatchlistStore(path).check_name("John Smith").empty
+
+def test_screen_batch_same_as_pairwise():
+    names = TEST_NAMES + ["Oumeyma Sokkeh", "sokkeh oumeyma"]  # doublons volontaires
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _write_watchlist(WATCHLIST, tmp)
+        store = WatchlistStore(path)
+        df = pd.read_excel(path)
+        expected = {(i, row) for i, name in enumerate(names)
+                    for row in _brute_force(df, name).index}
+
+        for processes in (1, 2):
+            result = store.screen_batch(names, processes=processes, chunk_size=2)
+            found = set(zip(result["Input Index"], result["Watchlist Row"]))
+            print(f"📋 {processes} processus → {len(result)} match(s)")
+            assert found == expected
+            assert (result["Input Name"] == [names[i] for i in result["Input Index"]]).all()
+            assert (result["Full Name"] == df.loc[result["Watchlist Row"], "Full Name"].values).all()
+
+def test_result_cache_invalidated_on_reload():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _write_watchlist(WATCHLIST, tmp)
+        store = WatchlistStore(path)
+        first = store.check_name("John Smyth")
+        again = store.check_name("  john smyth ")  # même nom une fois prétraité
+        assert again.index.tolist() == first.index.tolist()
+        stats = store.cache_stats()
+        assert stats['hits'] == 1 and stats['misses'] == 1
+
+        # Nouvelle version de la liste : le cache est vidé et la clé change
+        mtime = store.snapshot.mtime
+        _write_watchlist(WATCHLIST[WATCHLIST["Full Name"] != "John Smith"], tmp)
+        os.utime(path, (mtime + 10, mtime + 10))
+        assert "John Smith" not in store.check_name("John Smyth")["Full Name"].tolist()
+        assert store.cache_stats()['misses'] == 2
+
+def test_columnar_export_same_results():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _write_watchlist(WATCHLIST, tmp)
+        directory = export_watchlist(path)
+        assert directory.endswith(".watchlist")
+
+        excel_store = WatchlistStore(path)
+        mapped_store = WatchlistStore(directory)
+        snapshot = mapped_store.refresh()
+        assert isinstance(snapshot.names, np.memmap) and isinstance(snapshot.index.counts, np.memmap)
+        # Groupes Soundex/mots et vocabulaire aussi projetés : rien n'est reconstruit par worker
+        assert all(isinstance(getattr(snapshot.index, attr), np.memmap) for attr in WatchlistIndex.ARRAYS)
+        assert snapshot.version == excel_store.refresh().version
+
+        for name in TEST_NAMES:
+            expected = excel_store.check_name(name)
+            result = mapped_store.check_name(name)
+            assert result.index.tolist() == expected.index.tolist()
+            if not expected.empty:
+                assert result.columns.tolist() == expected.columns.tolist()
+                assert result["Full Name"].tolist() == expected["Full Name"].tolist()
+                assert result["Risk Category"].tolist() == expected["Risk Category"].tolist()
+
+        batch = mapped_store.screen_batch(TEST_NAMES)
+        expected = excel_store.screen_batch(TEST_NAMES)
+        assert batch[["Input Index", "Watchlist Row"]].values.tolist() == \
+               expected[["Input Index", "Watchlist Row"]].values.tolist()
+
+        # Nouvel export : rechargé automatiquement
+        updated = pd.concat([WATCHLIST, pd.DataFrame({"Full Name": ["Zoe Xu"], "Risk Category": ["High"]})])
+        _write_watchlist(updated, tmp)
+        export_watchlist(path)
+        manifest = os.path.join(directory, "manifest.json")
+        os.utime(manifest, (snapshot.mtime + 10, snapshot.mtime + 10))
+        assert len(mapped_store.refresh()) == len(snapshot) + 1
+
+def test_registry_single_pass_over_several_lists():
+    pep = pd.DataFrame({"Full Name": ["John Smith", "Leila Gharbi"], "Source": ["PEP", "PEP"]})
+    with tempfile.TemporaryDirectory() as tmp:
+        sanctions_path = _write_watchlist(WATCHLIST, tmp)
+        pep_path = os.path.join(tmp, "pep.xlsx")
+        pep.to_excel(pep_path, index=False)
+        pep_dir = export_watchlist(pep_path)
+
+        registry = WatchlistRegistry({"sanctions": sanctions_path, "pep": pep_dir})
+        separate = {"sanctions": WatchlistStore(sanctions_path), "pep": WatchlistStore(pep_dir)}
+        assert registry.refresh().columns == ["Watchlist", "Full Name", "Risk Category", "Source"]
+
+        for name in TEST_NAMES + ["Leila Gharbi"]:
+            result = registry.check_name(name)
+            expected = {(list_name, row) for list_name, store in separate.items()
+                        for row in store.check_name(name).index}
+            found = set(zip(result["Watchlist"], result.index)) if not result.empty else set()
+            print(f"🗃️ '{name}' → {sorted({list_name for list_name, _ in found})}")
+            assert found == expected
+            if not result.empty:
+                for list_name, row in zip(result["Watchlist"], result["Full Name"]):
+                    assert row in (WATCHLIST if list_name == "sanctions" else pep)["Full Name"].tolist()
+
+        assert "pep" in registry.matched_lists("John Smith")
+        assert "sanctions" in registry.matched_lists("John Smith")
+
+        batch = registry.screen_batch(["John Smith", "Leila Gharbi"])
+        assert {"sanctions", "pep"} <= set(batch["Watchlist"])
+
+def test_combined_index_exported_for_mapped_lists():
+    pep = pd.DataFrame({"Full Name": ["John Smith", "Leila Gharbi"], "Source": ["PEP", "PEP"]})
+    with tempfile.TemporaryDirectory() as tmp:
+        sanctions_path = _write_watchlist(WATCHLIST, tmp)
+        pep_path = os.path.join(tmp, "pep.xlsx")
+        pep.to_excel(pep_path, index=False)
+        paths = {"sanctions": export_watchlist(sanctions_path), "pep": export_watchlist(pep_path)}
+
+        mapped = WatchlistRegistry(paths)
+        snapshot = mapped.refresh()
+        assert isinstance(snapshot.names, np.memmap)
+        assert all(isinstance(getattr(snapshot.index, attr), np.memmap) for attr in WatchlistIndex.ARRAYS)
+        exported = [entry for entry in os.listdir(tmp) if entry.startswith(".aml-combined-")]
+        assert len(exported) == 1
+
+        # Un second worker projette le même export ; résultats identiques à l'index construit en mémoire
+        assert WatchlistRegistry(paths).refresh().index.counts.filename == snapshot.index.counts.filename
+        in_memory = WatchlistRegistry({"sanctions": sanctions_path, "pep": pep_path})
+        for name in TEST_NAMES + ["Leila Gharbi"]:
+            result, expected = mapped.check_name(name), in_memory.check_name(name)
+            assert set(zip(result.get("Watchlist", []), result.index)) == \
+                   set(zip(expected.get("Watchlist", []), expected.index)), name
+
+        # Nouvelle version d'une liste : nouvel index commun, l'ancien est supprimé
+        pep = pd.concat([pep, pd.DataFrame({"Full Name": ["Zoe Xu"], "Source": ["PEP"]})])
+        pep.to_excel(pep_path, index=False)
+        export_watchlist(pep_path)
+        manifest = os.path.join(paths["pep"], "manifest.json")
+        os.utime(manifest, (time.time() + 10, time.time() + 10))
+        assert len(mapped.refresh()) == len(snapshot) + 1
+        assert [entry for entry in os.listdir(tmp) if entry.startswith(".aml-combined-")] != exported
+        assert len([entry for entry in os.listdir(tmp) if entry.startswith(".aml-combined-")]) == 1
+
+if __name__ == "__main__":
+    test_same_matches_as_brute_force()
+    test_vocalized_arabic_name_matches()
+    test_loaded_once_and_reloaded_on_change()
+    test_missing_name_column()
+    test_screen_batch_same_as_pairwise()
+    test_result_cache_invalidated_on_reload()
+    test_columnar_export_same_results()
+    test_registry_single_pass_over_several_lists()
+    test_combined_index_exported_for_mapped_lists()
+    print("🏁 Tests terminés")
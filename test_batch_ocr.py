@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du traitement OCR en masse : liste des images et reprise après interruption
+"""
+
+import os
+import json
+import tempfile
+
+from batch_ocr import FIELDS, ResultWriter, completed_images, list_images
+
+def _record(image, status='ok'):
+    record = dict.fromkeys(FIELDS, "")
+    record.update(image=image, status=status, cin="08002808", nom="نايلي", seconds=0.5)
+    return record
+
+def test_directory_and_manifest():
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "lot"))
+        for name in ("b.jpg", "a.PNG", "notes.txt", os.path.join("lot", "c.jpeg")):
+            open(os.path.join(tmp, name), 'w').close()
+        assert [os.path.relpath(p, tmp) for p in list_images(tmp)] == ["a.PNG", "b.jpg", os.path.join("lot", "c.jpeg")]
+
+        manifest = os.path.join(tmp, "manifest.json")
+        with open(manifest, 'w') as f:
+            json.dump([{"image": "b.jpg", "cin": "1"}, "lot/c.jpeg"], f)
+        assert list_images(manifest) == [os.path.join(tmp, "b.jpg"), os.path.join(tmp, "lot/c.jpeg")]
+
+        listing = os.path.join(tmp, "liste.txt")
+        with open(listing, 'w') as f:
+            f.write("# scans du lundi\na.PNG\n\n/abs/d.jpg\n")
+        assert list_images(listing) == [os.path.join(tmp, "a.PNG"), "/abs/d.jpg"]
+
+def test_resume_after_interruption():
+    for fmt in ("csv", "jsonl"):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, f"resultats.{fmt}")
+            writer = ResultWriter(output, fmt)
+            writer.write(_record("a.jpg"))
+            writer.write(_record("b.jpg", status='rejected'))
+            writer.write(_record("c.jpg", status='error'))  # erreur passagère : à refaire
+            writer.write(_record("d.jpg"))
+            writer.close()
+
+            # Interruption pendant l'écriture de la dernière ligne
+            with open(output, 'rb+') as f:
+                f.truncate(os.path.getsize(output) - 12)
+            assert completed_images(output, fmt) == {"a.jpg", "b.jpg"}
+
+            writer = ResultWriter(output, fmt)
+            writer.write(_record("d.jpg"))
+            writer.close()
+            print(f"♻️ {fmt}: reprise → {sorted(completed_images(output, fmt))}")
+            assert completed_images(output, fmt) == {"a.jpg", "b.jpg", "d.jpg"}
+
+if __name__ == "__main__":
+    test_directory_and_manifest()
+    test_resume_after_interruption()
+    print("🏁 Tests terminés")
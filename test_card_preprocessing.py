@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du prétraitement des photos de CIN (détection, redressement, mise à l'échelle)
+"""
+
+import cv2
+import numpy as np
+
+from bench_ocr import SAMPLE_IMAGE, synthetic_photo
+from card_preprocessing import CARD_HEIGHT, CARD_WIDTH, field_boxes, find_card_quad, order_corners, preprocess_card
+
+def test_card_found_on_simulated_photos():
+    for seed in range(5):
+        photo, corners = synthetic_photo(seed=seed)
+        quad = find_card_quad(photo)
+        assert quad is not None, f"Carte non détectée (seed={seed})"
+        error = np.abs(order_corners(quad) - order_corners(corners)).max()
+        print(f"📐 seed={seed} → écart max des coins: {error:.1f}px")
+        assert error < 0.01 * photo.shape[1]
+
+        card, aligned = preprocess_card(photo)
+        assert aligned and card.shape[:2] == (CARD_HEIGHT, CARD_WIDTH)
+
+def test_portrait_photo_is_turned_landscape():
+    photo = cv2.rotate(synthetic_photo(seed=1)[0], cv2.ROTATE_90_CLOCKWISE)
+    card, aligned = preprocess_card(photo)
+    assert aligned and card.shape[:2] == (CARD_HEIGHT, CARD_WIDTH)
+
+def test_scan_and_fallback():
+    card, aligned = preprocess_card(SAMPLE_IMAGE)
+    assert aligned and card.shape[:2] == (CARD_HEIGHT, CARD_WIDTH)
+
+    # Pas de carte : la photo est seulement réduite, sans déformation
+    noise = np.random.default_rng(0).integers(0, 255, (2000, 1500, 3), dtype=np.uint8)
+    image, aligned = preprocess_card(noise)
+    assert not aligned and image.shape[:2] == (CARD_WIDTH, CARD_WIDTH * 1500 // 2000)
+
+    binary, _ = preprocess_card(SAMPLE_IMAGE, binarize_output=True)
+    assert binary.ndim == 2 and set(np.unique(binary)) <= {0, 255}
+
+def test_template_boxes_cover_the_fields():
+    card, _ = preprocess_card(SAMPLE_IMAGE)
+    gray = cv2.cvtColor(card, cv2.COLOR_BGR2GRAY)
+    boxes = field_boxes(card)
+    for field, (x0, x1, y0, y1) in boxes.items():
+        assert 0 <= x0 < x1 <= CARD_WIDTH and 0 <= y0 < y1 <= CARD_HEIGHT, field
+        # Chaque zone contient du texte imprimé (pixels sombres)
+        ink = (gray[y0:y1, x0:x1] < 100).mean()
+        print(f"🗺️ {field}: {x1 - x0}x{y1 - y0}px, encre {ink:.1%}")
+        assert ink > 0.01, field
+    ordered = sorted(boxes.values(), key=lambda box: box[2])
+    assert all(a[3] <= b[2] for a, b in zip(ordered, ordered[1:]))  # zones sans chevauchement vertical
+
+if __name__ == "__main__":
+    test_card_found_on_simulated_photos()
+    test_portrait_photo_is_turned_landscape()
+    test_scan_and_fallback()
+    test_template_boxes_cover_the_fields()
+    print("🏁 Tests terminés")
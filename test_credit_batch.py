@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du score par lot (predict_batch) : mêmes résultats qu'une prédiction par demande
+"""
+
+import os
+import tempfile
+
+from bench_credit import sample_forms, train_model
+from credit_prediction import CreditPredictor, ModelRegistry
+
+EDGE_FORMS = [
+    {},
+    {'Age': '', 'Annual_Income': 'abc', 'Occupation': 'Astronaut', 'Credit_Mix': None},
+    {'Age': '41.5', 'Num_of_Loan': '3', 'Type_of_Loan': 'Payday Loan', 'Payment_of_Min_Amount': 'No'},
+]
+
+def _assert_same_as_single(predictor, forms):
+    results = predictor.predict_batch(forms)
+    assert len(results) == len(forms)
+    for form, result in zip(forms, results):
+        assert result == predictor.predict_credit_approval(form), form
+
+def test_batch_same_as_single_predictions():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "random_forest_model.pkl")
+        train_model(path, n_estimators=10)
+        predictor = CreditPredictor(path, registry=ModelRegistry())
+        _assert_same_as_single(predictor, sample_forms(50) + EDGE_FORMS)
+        assert predictor.predict_batch([]) == []
+
+def test_batch_in_fallback_mode():
+    predictor = CreditPredictor("modele_absent.pkl", registry=ModelRegistry())
+    _assert_same_as_single(predictor, sample_forms(20) + EDGE_FORMS[:1])
+
+if __name__ == "__main__":
+    test_batch_same_as_single_predictions()
+    test_batch_in_fallback_mode()
+    print("🏁 Tests terminés")
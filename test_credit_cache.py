@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du cache des prédictions : demande resoumise servie depuis le cache, invalidé par un nouveau modèle
+"""
+
+import os
+import tempfile
+import numpy as np
+
+from bench_credit import sample_forms, train_model
+from credit_prediction import EXPECTED_FEATURES, CreditPredictor, ModelRegistry
+
+def test_resubmission_hits_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "random_forest_model.pkl")
+        train_model(path, n_estimators=10)
+        predictor = CreditPredictor(path, registry=ModelRegistry(), cache_size=8, cache_ttl=60)
+        form = sample_forms(1)[0]
+
+        first = predictor.predict_fast(form)
+        first['details']['age'] = -1  # le résultat rendu ne modifie pas le cache
+        second = predictor.predict_fast(dict(form))
+        assert second['details']['age'] != -1
+        assert second == predictor.predict_credit_approval(form)
+
+        # Saisie différente mais même encodage (valeur inconnue → code par défaut) : même entrée
+        predictor.predict_fast(dict(form, Occupation='Astronaut'))
+        predictor.predict_fast(dict(form, Occupation='Autre métier'))
+
+        stats = predictor.cache_stats()
+        assert stats['hits'] == 2 and stats['misses'] == 2 and stats['size'] == 2
+        assert stats['seconds_saved'] > 0 and stats['ms_saved_per_hit'] > 0
+        print(f"✅ Cache: {stats}")
+
+def test_cache_key():
+    row = np.zeros((1, len(EXPECTED_FEATURES)))
+    negative_zero = np.full_like(row, -0.0)
+    assert CreditPredictor.cache_key(row, "v1") == CreditPredictor.cache_key(negative_zero, "v1")
+    assert CreditPredictor.cache_key(row, "v1") != CreditPredictor.cache_key(row, "v2")
+    row[0, 1] = 1e-12
+    assert CreditPredictor.cache_key(row, "v1") != CreditPredictor.cache_key(negative_zero, "v1")
+
+    # Mode alternatif : pas de mise en cache
+    fallback = CreditPredictor("modele_absent.pkl", registry=ModelRegistry())
+    fallback.predict_fast(sample_forms(1)[0])
+    assert fallback.cache_stats()['size'] == 0
+    print("✅ Clé canonique liée à la version du modèle")
+
+if __name__ == "__main__":
+    test_resubmission_hits_cache()
+    test_cache_key()
+    print("🏁 Tests terminés")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du score de secours vectorisé : identique au calcul ligne par ligne sur des demandes aléatoires
+"""
+
+import io
+import random
+import contextlib
+
+from credit_prediction import CreditPredictor, ModelRegistry
+
+NUMERIC_FIELDS = ['Age', 'Annual_Income', 'Monthly_Inhand_Salary', 'Credit_Utilization_Ratio', 'Credit_History_Age',
+                  'Num_of_Delayed_Payment', 'Outstanding_Debt', 'Num_Credit_Inquiries']
+SPECIAL_VALUES = ['', None, 'abc', 'nan', 'inf', '-inf', '1e400', str(10 ** 20), str(-10 ** 15), '41.5', ' 7 ', True, -0.0]
+
+def random_value(rng):
+    choice = rng.random()
+    if choice < 0.1:
+        return rng.choice(SPECIAL_VALUES)
+    if choice < 0.4:
+        # Autour des seuils des règles (10, 30, 50, 75000...)
+        return str(rng.choice([0, 2, 5, 10, 18, 25, 30, 50, 55, 65, 70, 30000, 50000, 75000, 100000, 50000000])
+                   + rng.choice([-1, 0, 1]))
+    if choice < 0.7:
+        return str(rng.randint(-100, 200000))
+    if choice < 0.9:
+        return rng.uniform(-1000, 200000)
+    return repr(rng.uniform(-1e6, 1e9))
+
+def random_form(rng):
+    form = {field: random_value(rng) for field in NUMERIC_FIELDS if rng.random() < 0.9}
+    if rng.random() < 0.9:
+        form['Payment_of_Min_Amount'] = rng.choice(['Yes', 'No', 'NM', None, 'no'])
+    if rng.random() < 0.9:
+        form['Credit_Mix'] = rng.choice(['Standard', 'Good', 'Bad', '', None])
+    return form
+
+def test_vectorized_fallback_matches_scalar():
+    rng = random.Random(2024)
+    predictor = CreditPredictor("modele_absent.pkl", registry=ModelRegistry())
+    forms = [random_form(rng) for _ in range(5000)]
+    forms += [{}, {'Age': '40'}, {'Outstanding_Debt': '-inf'}, {'Outstanding_Debt': 'nan'}]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = [predictor.calculate_credit_score_fallback(form) for form in forms]
+    scores = predictor.calculate_credit_scores_fallback(forms)
+
+    mismatches = [(form, a, b) for form, a, b in zip(forms, expected, scores) if a != b]
+    assert not mismatches, mismatches[:5]
+    assert len(set(expected)) > 50 and expected.count(650) < len(forms)
+    assert len(predictor.calculate_credit_scores_fallback([])) == 0
+    print(f"✅ {len(forms)} demandes aléatoires : scores identiques")
+
+if __name__ == "__main__":
+    test_vectorized_fallback_matches_scalar()
+    print("🏁 Tests terminés")
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du chemin rapide (predict_fast) : mêmes résultats que predict_credit_approval
+"""
+
+import os
+import tempfile
+
+from bench_credit import sample_forms, train_model
+from credit_prediction import CreditPredictor, ModelRegistry
+from test_credit_batch import EDGE_FORMS
+
+def test_fast_path_same_as_approval():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "random_forest_model.pkl")
+        train_model(path, n_estimators=10)
+        predictor = CreditPredictor(path, registry=ModelRegistry())
+        assert predictor.loaded_model.forest is not None
+        for form in sample_forms(50) + EDGE_FORMS:
+            assert predictor.predict_fast(form) == predictor.predict_credit_approval(form), form
+        print("✅ predict_fast identique à predict_credit_approval")
+
+def test_fast_path_in_fallback_mode():
+    predictor = CreditPredictor("modele_absent.pkl", registry=ModelRegistry())
+    for form in sample_forms(10) + EDGE_FORMS[:1]:
+        assert predictor.predict_fast(form) == predictor.predict_credit_approval(form)
+    print("✅ Mode fallback identique")
+
+if __name__ == "__main__":
+    test_fast_path_same_as_approval()
+    test_fast_path_in_fallback_mode()
+    print("🏁 Tests terminés")
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du registre des modèles : un seul chargement par fichier, à la demande ou par warm_up
+"""
+
+import os
+import tempfile
+
+from bench_credit import train_model
+from credit_prediction import CreditPredictor, ModelRegistry
+
+def test_model_loaded_once_and_lazily():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "random_forest_model.pkl")
+        train_model(path, n_estimators=10)
+        registry = ModelRegistry()
+
+        first = CreditPredictor(path, registry=registry)
+        second = CreditPredictor(path, registry=registry)
+        assert registry.loaded_paths() == []  # rien n'est chargé à la construction
+
+        assert first.warm_up()
+        assert second.model is first.model
+        assert registry.loaded_paths() == [os.path.abspath(path)]
+        assert first.loaded_model.version and not first.use_fallback
+
+def test_missing_model_uses_fallback():
+    registry = ModelRegistry()
+    predictor = CreditPredictor("modele_absent.pkl", registry=registry)
+    assert not predictor.warm_up() and predictor.use_fallback
+    result = predictor.predict_credit_approval({'Age': '35', 'Annual_Income': '80000'})
+    assert 300 <= result['credit_score'] <= 850
+
+if __name__ == "__main__":
+    test_model_loaded_once_and_lazily()
+    test_missing_model_uses_fallback()
+    print("🏁 Tests terminés")
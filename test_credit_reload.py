@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du rechargement à chaud du modèle de crédit : substitution atomique, fichier invalide ignoré, surveillance
+"""
+
+import os
+import time
+import tempfile
+
+from bench_credit import sample_forms, train_model
+from create_random_forest_model import export_flat_forest
+from credit_prediction import (CATEGORICAL_MAPPINGS, CategoricalVocabulary, CreditPredictor, ModelRegistry,
+                               vocabulary_path)
+
+def test_reload_swaps_valid_model_only():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "random_forest_model.pkl")
+        train_model(path, n_estimators=10)
+        predictor = CreditPredictor(path, registry=ModelRegistry())
+        form = sample_forms(1)[0]
+        old = predictor.loaded_model
+        predictor.predict_fast(form)
+
+        # Nouveau fichier : rien ne change avant le rechargement
+        train_model(path, n_estimators=3)
+        assert predictor.loaded_model is old
+
+        status = predictor.reload_model(background=False)
+        assert status['status'] == 'swapped' and status['previous_version'] == old.version
+        assert predictor.loaded_model.version == status['version'] != old.version
+        assert len(predictor.loaded_model.forest.roots) == 3
+        assert predictor.predict_fast(form) == predictor.predict_credit_approval(form)
+        # Une prédiction qui avait lu l'ancien modèle le garde jusqu'au bout
+        assert old.model is not None and len(old.forest.roots) == 10
+        assert predictor.model_status()['last_reload']['status'] == 'swapped'
+
+        assert predictor.reload_model(background=False)['status'] == 'unchanged'
+
+        # Fichier corrompu : l'ancien modèle reste en service
+        current = predictor.loaded_model
+        with open(path, 'wb') as f:
+            f.write(b"pas un modele")
+        status = predictor.reload_model(background=False)
+        assert status['status'] == 'failed' and status['error']
+        assert predictor.loaded_model is current
+        print("✅ Substitution atomique, fichier invalide ignoré")
+
+def test_reload_picks_up_vocabulary_and_flat_forest():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "random_forest_model.pkl")
+        train_model(path, n_estimators=5)
+        predictor = CreditPredictor(path, registry=ModelRegistry())
+        old = predictor.loaded_model
+
+        # Même pickle, nouveau vocabulaire : substitué
+        mappings = dict(CATEGORICAL_MAPPINGS, Credit_Mix=({'Standard': 0, 'Good': 1, 'Bad': 2}, 0))
+        CategoricalVocabulary(mappings).save(vocabulary_path(path))
+        status = predictor.reload_model(background=False)
+        assert status['status'] == 'swapped' and status['version'] == old.version
+        assert predictor.vocabulary.version == status['vocabulary'] != old.vocabulary.version
+        assert predictor.vocabulary.encode('Credit_Mix', 'Bad') == 2
+
+        # Même pickle, forêt aplatie exportée : substituée
+        assert export_flat_forest(path)
+        assert predictor.reload_model(background=False)['status'] == 'swapped'
+        assert predictor.loaded_model.flat_version is not None
+        assert predictor.reload_model(background=False)['status'] == 'unchanged'
+        print("✅ Vocabulaire et forêt aplatie rechargés avec le modèle")
+
+def test_watcher_reloads_changed_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "random_forest_model.pkl")
+        predictor = CreditPredictor(path, registry=ModelRegistry())
+        assert predictor.model_status()['fallback']
+
+        predictor.watch_model(interval=0.05)
+        assert predictor.loaded_model.model is None  # première lecture : démarre la surveillance
+        try:
+            # Déploiement par renommage d'un fichier complet
+            train_model(os.path.join(tmp, "nouveau.pkl"), n_estimators=3)
+            os.replace(os.path.join(tmp, "nouveau.pkl"), path)
+            deadline = time.monotonic() + 5
+            while predictor.loaded_model.model is None and time.monotonic() < deadline:
+                time.sleep(0.05)
+        finally:
+            predictor.stop_watching()
+        assert predictor.loaded_model.model is not None
+        assert predictor.model_status()['last_reload']['status'] == 'swapped'
+        print("✅ Nouveau fichier chargé par la surveillance")
+
+if __name__ == "__main__":
+    test_reload_swaps_valid_model_only()
+    test_reload_picks_up_vocabulary_and_flat_forest()
+    test_watcher_reloads_changed_file()
+    print("🏁 Tests terminés")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du vocabulaire catégoriel : codes identiques à l'entraînement et en production, versionnés avec le modèle
+"""
+
+import os
+import json
+import tempfile
+import numpy as np
+
+from bench_credit import train_model
+from create_random_forest_model import create_sample_data, encode_categorical_features
+from credit_prediction import CATEGORICAL_MAPPINGS, VOCABULARY, CategoricalVocabulary, ModelRegistry, vocabulary_path
+
+def test_transform_matches_scalar_encoding():
+    values = ['Engineer', 'Other', 'Astronaut', None, '', 'Scientist', float('nan')]
+    codes = VOCABULARY.transform('Occupation', values)
+    assert codes.dtype == np.float64
+    assert list(codes) == [VOCABULARY.encode('Occupation', value) for value in values]
+    assert list(codes) == [1, 11, 11, 11, 11, 8, 11]
+
+    # Les données d'entraînement sont encodées avec les mêmes codes
+    df = create_sample_data()
+    encoded = encode_categorical_features(df)
+    for feature in CATEGORICAL_MAPPINGS:
+        assert list(encoded[feature]) == [VOCABULARY.encode(feature, value) for value in df[feature]]
+    print("✅ Codes identiques (lot, ligne, entraînement)")
+
+def test_vocabulary_saved_with_model():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "random_forest_model.pkl")
+        train_model(path, n_estimators=5)
+        assert ModelRegistry().get(path).vocabulary.version == VOCABULARY.version
+
+        # Vocabulaire propre au modèle : utilisé pour l'encodage des demandes
+        mappings = dict(CATEGORICAL_MAPPINGS, Credit_Mix=({'Standard': 0, 'Good': 1, 'Bad': 2}, 0))
+        CategoricalVocabulary(mappings).save(vocabulary_path(path))
+        loaded = ModelRegistry().get(path)
+        assert loaded.vocabulary.version != VOCABULARY.version
+        assert loaded.vocabulary.encode_form({'Credit_Mix': 'Bad'})['Credit_Mix'] == 2
+
+        # Un fichier modifié à la main est refusé (mode alternatif)
+        with open(vocabulary_path(path), encoding='utf-8') as f:
+            content = json.load(f)
+        content['features']['Credit_Mix']['codes']['Bad'] = 5
+        with open(vocabulary_path(path), 'w', encoding='utf-8') as f:
+            json.dump(content, f)
+        assert ModelRegistry().get(path).model is None
+        print("✅ Vocabulaire versionné avec le modèle")
+
+if __name__ == "__main__":
+    test_transform_matches_scalar_encoding()
+    test_vocabulary_saved_with_model()
+    print("🏁 Tests terminés")
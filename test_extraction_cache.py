@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du cache des résultats OCR par empreinte d'image (le moteur OCR est remplacé par un faux)
+"""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import extraction
+import ocr_backends
+from ocr_backends import OCRBackend
+
+class FakeReader(OCRBackend):
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    def readtext(self, image):
+        self.calls += 1
+        return [self.text]
+
+    def recognize(self, gray, boxes, allowlist=None):
+        self.calls += 1
+        return [self.text for _ in boxes]
+
+class FakePool:
+    backend = "fake"
+
+    def __init__(self, reader):
+        self._reader = reader
+
+    @contextmanager
+    def reader(self, timeout=None):
+        yield self._reader
+
+@contextmanager
+def fake_pool(reader):
+    pool, extraction.reader_pool = extraction.reader_pool, FakePool(reader)
+    try:
+        yield reader
+    finally:
+        extraction.reader_pool = pool
+
+def test_same_image_read_once():
+    extraction.resultats_ocr.clear()
+    with tempfile.TemporaryDirectory() as tmp, fake_pool(FakeReader("بطاقة 08002808 اللقب نايلي الاسم حسن")) as reader:
+        first = os.path.join(tmp, "cin_a.jpg")
+        shutil.copy("id_card_sample.png", first)
+        again = os.path.join(tmp, "cin_b.jpg")  # même contenu, autre nom
+        shutil.copy(first, again)
+
+        result = extraction.extraire_donnees(first, preprocess=False, mode="page")
+        assert extraction.extraire_donnees(again, preprocess=False, mode="page") == result
+        assert reader.calls == 1
+        assert result[0] == "08002808"
+
+        # Autres réglages OCR : nouvelle lecture
+        extraction.extraire_donnees(first, preprocess=False, binarize=True, mode="page")
+        assert reader.calls == 2
+
+def test_rejected_image_not_read_again():
+    extraction.resultats_ocr.clear()
+    with tempfile.TemporaryDirectory() as tmp, fake_pool(FakeReader("photo de vacances")) as reader:
+        path = os.path.join(tmp, "cin.jpg")
+        shutil.copy("id_card_sample.png", path)
+        for _ in range(2):
+            try:
+                extraction.extraire_donnees(path, preprocess=False, mode="page")
+                raise AssertionError("La carte aurait dû être refusée")
+            except ValueError as e:
+                assert "CIN" in str(e)
+        assert reader.calls == 1
+        print(f"📊 Cache OCR : {extraction.resultats_ocr.stats()}")
+
+def test_incomplete_backend_rejected_at_creation():
+    class PageOnlyReader(OCRBackend):
+        def readtext(self, image):
+            return []
+    try:
+        PageOnlyReader()
+        raise AssertionError("Un moteur sans recognize aurait dû être refusé")
+    except TypeError:
+        pass
+
+def test_explicit_backend_decides():
+    """Le moteur passé à ReaderPool est vérifié, pas celui de OCR_BACKEND (ex. hôte avec Tesseract seul)"""
+    class InstalledReader(FakeReader):
+        name = "installe"
+
+        def __init__(self, languages):
+            super().__init__("")
+
+        @staticmethod
+        def available():
+            return True
+
+    ocr_backends.BACKENDS["installe"] = InstalledReader
+    try:
+        pool = extraction.ReaderPool(size=1, backend="installe")
+        with pool.reader() as reader:
+            assert isinstance(reader, InstalledReader)
+    finally:
+        del ocr_backends.BACKENDS["installe"]
+    try:
+        extraction.ReaderPool(backend="absent")
+        raise AssertionError("Un moteur non installé aurait dû être refusé")
+    except ImportError:
+        pass
+
+if __name__ == "__main__":
+    test_same_image_read_once()
+    test_rejected_image_not_read_again()
+    test_incomplete_backend_rejected_at_creation()
+    test_explicit_backend_decides()
+    print("🏁 Tests terminés")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la forêt aplatie : mêmes prédictions que sklearn, export et rechargement avec le modèle
+"""
+
+import os
+import tempfile
+import joblib
+import numpy as np
+import pandas as pd
+
+from bench_credit import sample_forms, train_model
+from create_random_forest_model import export_flat_forest
+from credit_prediction import EXPECTED_FEATURES, CreditPredictor, FlatForest, ModelRegistry, flat_forest_path
+
+def test_flat_forest_same_predictions():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "random_forest_model.pkl")
+        model = train_model(path, n_estimators=20)
+        predictor = CreditPredictor(path, registry=ModelRegistry())
+        X = predictor.encode_batch(sample_forms(300))
+        X[0, 3] = -1e30
+        X[1, 1] = 1e30
+
+        forest = FlatForest.from_model(model)
+        model.n_jobs = 1  # somme séquentielle des arbres, comme en production (cf. load_model)
+        expected = model.predict(pd.DataFrame(X, columns=EXPECTED_FEATURES))
+        assert np.array_equal(forest.predict(X), expected)
+        X32 = X.astype(np.float32)
+        assert all(forest.predict_row(X32[i]) == expected[i] for i in range(len(X)))
+        print("✅ Prédictions identiques à sklearn")
+
+def test_export_and_reload():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "random_forest_model.pkl")
+        train_model(path, n_estimators=10)
+        assert export_flat_forest(path)
+        assert os.path.exists(flat_forest_path(path))
+
+        loaded = ModelRegistry().get(path)
+        assert loaded.forest.version == loaded.version
+        assert isinstance(loaded.forest.threshold.base, np.memmap)  # projeté, pas recopié
+        assert loaded.flat_version == loaded.forest.checksum
+        exported = FlatForest.from_model(loaded.model)
+        assert np.array_equal(loaded.forest.threshold, exported.threshold)
+
+        # Un export qui ne correspond plus au modèle est ignoré
+        train_model(path, n_estimators=5)
+        loaded = ModelRegistry().get(path)
+        assert len(loaded.forest.roots) == 5
+        print("✅ Export rechargé avec le modèle correspondant")
+
+def test_multithreaded_model_served_sequentially():
+    """Modèle sauvegardé avec n_jobs > 1 : sklearn additionnerait les arbres dans un ordre variable"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "random_forest_model.pkl")
+        model = train_model(path, n_estimators=50)
+        model.n_jobs = 8
+        joblib.dump(model, path)
+
+        predictor = CreditPredictor(path, registry=ModelRegistry())
+        assert predictor.model.n_jobs == 1
+        for form in sample_forms(200):
+            assert predictor.predict_fast(form) == predictor.predict_credit_approval(form), form
+        assert export_flat_forest(path)
+        print("✅ Modèle multi-thread servi en séquentiel, export accepté")
+
+if __name__ == "__main__":
+    test_flat_forest_same_predictions()
+    test_export_and_reload()
+    test_multithreaded_model_served_sequentially()
+    print("🏁 Tests terminés")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la file d'attente des traitements OCR (OCRJobQueue)
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from ocr_jobs import OCRJobQueue, QueueFullError
+
+def _wait(queue, job_id, owner=None, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.status(job_id, owner)
+        if job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} non terminé")
+
+def test_submit_returns_at_once_and_result_is_polled():
+    queue = OCRJobQueue(workers=2)
+    release = threading.Event()
+
+    def slow_ocr(path):
+        release.wait(5)
+        return {'data': {'cin': "08002808", 'path': path}}
+
+    start = time.perf_counter()
+    job_id = queue.submit(slow_ocr, "cin.jpg", owner="client@example.com")
+    assert time.perf_counter() - start < 0.5
+    assert queue.status(job_id, "client@example.com")['status'] in ('pending', 'running')
+
+    release.set()
+    job = _wait(queue, job_id, "client@example.com")
+    print(f"📋 Job {job_id[:8]} → {job['status']} en {job['finished'] - job['created']:.3f}s")
+    assert job['status'] == 'done' and job['result']['data']['cin'] == "08002808"
+    assert queue.status(job_id, "autre@example.com") is None  # job d'un autre utilisateur
+    assert queue.status("inconnu") is None
+    queue.shutdown()
+
+def test_failed_job_and_full_queue():
+    queue = OCRJobQueue(workers=1, max_pending=2)
+    release = threading.Event()
+
+    def broken(path):
+        release.wait(5)
+        raise RuntimeError("modèle absent")
+
+    first = queue.submit(broken, "a.jpg")
+    queue.submit(broken, "b.jpg")
+    try:
+        queue.submit(broken, "c.jpg")
+        raise AssertionError("La file aurait dû être pleine")
+    except QueueFullError:
+        pass
+
+    release.set()
+    job = _wait(queue, first)
+    assert job['status'] == 'failed' and "modèle absent" in job['error']
+    queue.shutdown()
+    assert queue.pending() == 0
+
+def test_status_shared_between_workers():
+    with tempfile.TemporaryDirectory() as store:
+        worker_a = OCRJobQueue(workers=1, store_dir=store)
+        worker_b = OCRJobQueue(workers=1, store_dir=store)  # autre processus gunicorn, même dossier
+
+        job_id = worker_a.submit(lambda path: {'data': {'cin': "08002808"}, 'aml': {'match': False},
+                                                'error_popup': None}, "cin.jpg", owner="client@example.com")
+        _wait(worker_a, job_id)
+        job = worker_b.status(job_id, "client@example.com")
+        assert job['status'] == 'done' and job['result']['data']['cin'] == "08002808"
+        assert worker_b.status(job_id, "autre@example.com") is None
+        assert worker_b.status("../../etc/passwd") is None
+
+        # Job expiré : inconnu pour tous les workers, fichier supprimé au nettoyage
+        expired = OCRJobQueue(workers=1, ttl=0, store_dir=store)
+        time.sleep(0.01)
+        assert expired.status(job_id) is None
+        expired._purge_expired()
+        assert not os.listdir(store)
+        for queue in (worker_a, worker_b, expired):
+            queue.shutdown()
+
+if __name__ == "__main__":
+    test_submit_returns_at_once_and_result_is_polled()
+    test_failed_job_and_full_queue()
+    test_status_shared_between_workers()
+    print("🏁 Tests terminés")
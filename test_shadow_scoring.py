@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du scoring fantôme : le challenger score en arrière-plan sans changer la décision, comparaison enregistrée
+"""
+
+import os
+import json
+import tempfile
+
+from bench_credit import sample_forms, train_model
+from credit_prediction import CreditPredictor, ModelRegistry
+from shadow_scoring import summarize
+
+def test_shadow_records_comparison():
+    with tempfile.TemporaryDirectory() as tmp:
+        champion_path = os.path.join(tmp, "random_forest_model.pkl")
+        challenger_path = os.path.join(tmp, "challenger.pkl")
+        store = os.path.join(tmp, "shadow_scores.jsonl")
+        train_model(champion_path, n_estimators=10)
+        train_model(challenger_path, n_estimators=3, max_depth=4)
+
+        reference = CreditPredictor(champion_path, registry=ModelRegistry())
+        predictor = CreditPredictor(champion_path, registry=ModelRegistry(),
+                                    shadow_model=challenger_path, shadow_store=store)
+        forms = sample_forms(20)
+        for form in forms:
+            assert predictor.predict_fast(form) == reference.predict_fast(form)
+        predictor.shadow.join()
+
+        with open(store, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        assert len(records) == len(forms)
+        challenger = predictor.registry.get(challenger_path)
+        for form, record in zip(forms, records):
+            assert record['champion_score'] == reference.predict_fast(form)['credit_score']
+            assert record['challenger_version'] == challenger.version
+            assert record['disagreement'] == abs(record['challenger_score'] - record['champion_score'])
+            assert record['champion_ms'] >= 0 and record['challenger_ms'] >= 0
+
+        summary = summarize(store)
+        assert summary['count'] == len(forms) and 0 <= summary['decision_flip_rate'] <= 1
+        assert predictor.model_status()['shadow']['recorded'] == len(forms)
+        predictor.shadow.close()
+        print(f"✅ Comparaison enregistrée: {summary}")
+
+def test_missing_challenger_does_not_affect_decisions():
+    with tempfile.TemporaryDirectory() as tmp:
+        champion_path = os.path.join(tmp, "random_forest_model.pkl")
+        train_model(champion_path, n_estimators=5)
+        predictor = CreditPredictor(champion_path, registry=ModelRegistry(),
+                                    shadow_model=os.path.join(tmp, "absent.pkl"),
+                                    shadow_store=os.path.join(tmp, "shadow_scores.jsonl"))
+        result = predictor.predict_fast(sample_forms(1)[0])
+        assert 'credit_score' in result
+        predictor.shadow.join()
+        stats = predictor.shadow.stats()
+        assert stats['failed'] == 1 and stats['recorded'] == 0
+        predictor.shadow.close()
+        print("✅ Challenger indisponible : décision inchangée")
+
+def test_thread_started_per_process():
+    with tempfile.TemporaryDirectory() as tmp:
+        champion_path = os.path.join(tmp, "random_forest_model.pkl")
+        train_model(champion_path, n_estimators=5)
+        predictor = CreditPredictor(champion_path, registry=ModelRegistry(), shadow_model=champion_path,
+                                    shadow_store=os.path.join(tmp, "shadow_scores.jsonl"))
+        shadow = predictor.shadow
+        assert shadow._thread is None  # rien ne démarre à l'import
+        predictor.predict_fast(sample_forms(1)[0])
+        first = shadow._thread
+        assert first.is_alive()
+        shadow.join()
+
+        shadow._pid = -1  # comme dans un worker forké : le thread du parent n'existe pas ici
+        predictor.predict_fast(sample_forms(2)[1])
+        assert shadow._thread is not first and shadow._thread.is_alive()
+        shadow.join()
+        assert shadow.stats()['recorded'] == 2
+        shadow.close()
+        print("✅ Thread fantôme démarré dans chaque processus")
+
+if __name__ == "__main__":
+    test_shadow_records_comparison()
+    test_missing_challenger_does_not_affect_decisions()
+    test_thread_started_per_process()
+    print("🏁 Tests terminés")